@@ -1,36 +1,45 @@
 import asyncio
-import json
+import copy
+import functools
+import hashlib
+import logging
 import os
+import re
 import resource
+import shutil
+import struct
 import subprocess
-import tempfile
 import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import asynccontextmanager
+from graphlib import CycleError, TopologicalSorter
 from pathlib import Path
 from typing import Any, Dict, List, Optional
 import uuid
 
+import orjson
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from RestrictedPython import compile_restricted, safe_globals
+try:
+    # Optional: Hyperscan DFA scanner for large TypeScript sources
+    # Install with: pip install hyperscan
+    import hyperscan
+except ImportError:
+    hyperscan = None
+
+logger = logging.getLogger("workflow")
+logger.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
 
 app = FastAPI()
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://localhost:3001",
-        "http://localhost:3002",
-        "http://localhost:3003",
-        "http://localhost:3004",
-        "http://localhost:3005",
-        "http://localhost:3006",
-        "http://localhost:3007",
-        "http://localhost:3008",
-        "http://localhost:3009",
-        "http://localhost:3010"
-    ],
+    # Matches http://localhost:3000 through http://localhost:3010
+    allow_origin_regex=r"^http://localhost:30(0[0-9]|10)$",
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
@@ -67,45 +76,110 @@ class WorkflowResult(BaseModel):
     total_time: float
     error: Optional[str] = None
 
-def topological_sort(nodes: List[Node], connections: List[Connection]) -> List[Node]:
-    """Topologically sort nodes based on connections"""
-    # Build adjacency list
-    graph = {node.id: [] for node in nodes}
-    in_degree = {node.id: 0 for node in nodes}
-    
+def topological_sort(nodes: List[Node], connections: List[Connection]) -> List[List[Node]]:
+    """Group nodes into topological levels - nodes within a level don't depend on each other"""
+    node_map = {node.id: node for node in nodes}
+    sorter = TopologicalSorter({node_id: () for node_id in node_map})
     for conn in connections:
-        graph[conn.source].append(conn.target)
-        in_degree[conn.target] += 1
+        if conn.source in node_map and conn.target in node_map:
+            sorter.add(conn.target, conn.source)
     
-    # Find nodes with no incoming edges
-    queue = [node_id for node_id, degree in in_degree.items() if degree == 0]
-    result = []
+    try:
+        sorter.prepare()
+    except CycleError as e:
+        raise ValueError("Circular dependency detected in workflow") from e
     
-    while queue:
-        node_id = queue.pop(0)
-        result.append(node_id)
-        
-        # Remove this node and update in-degrees
-        for neighbor in graph[node_id]:
-            in_degree[neighbor] -= 1
-            if in_degree[neighbor] == 0:
-                queue.append(neighbor)
+    # Each get_ready() batch is one level whose dependencies are all satisfied
+    levels = []
+    while sorter.is_active():
+        level = sorter.get_ready()
+        levels.append([node_map[node_id] for node_id in level])
+        sorter.done(*level)
+    return levels
+
+def _build_base_globals() -> Dict[str, Any]:
+    """Build the restricted globals template without mutating RestrictedPython's shared safe_globals"""
+    builtins = dict(safe_globals['__builtins__'])
+    builtins['_print_'] = lambda *args: print(*args)
+    builtins['_iter_unpack_sequence_'] = lambda seq, spec=2: seq
+    builtins['enumerate'] = enumerate
+    builtins['sorted'] = sorted
+    return {**safe_globals, '__builtins__': builtins}
+
+# Restricted globals template, built once at import instead of per call
+_BASE_GLOBALS = _build_base_globals()
+
+@functools.lru_cache(maxsize=512)
+def _compile_py(code: str):
+    """Compile restricted Python code, cached so re-run nodes skip the AST transform"""
+    return compile_restricted(code, '<string>', 'exec')
+
+# Numba-compiled code runs outside RestrictedPython, so the server operator
+# has to opt in explicitly before '# @jit' nodes are honored
+ALLOW_NUMBA_JIT = os.getenv('ALLOW_NUMBA_JIT', '').lower() in ('1', 'true', 'yes')
+JIT_CACHE_DIR = Path('/tmp/workflow_jit')
+
+def _wants_jit(code: str) -> bool:
+    """Check for the '# @jit' directive on the first line of a Python node"""
+    return code.split('\n', 1)[0].strip() == '# @jit'
+
+@functools.cache
+def _load_numba():
+    """Import Numba on the first '# @jit' node, or None if it isn't installed"""
+    # Loaded lazily: numba and llvmlite are slow to import and large for capped pool workers
+    try:
+        # Optional: Numba JIT for numeric Python nodes marked with '# @jit'
+        # Install with: pip install numba
+        import numba
+        import numba.core.errors
+    except ImportError:
+        return None
+    return numba
+
+@functools.lru_cache(maxsize=128)
+def _load_jit_run(code: str):
+    """Compile a node's run() with numba.njit, keyed by code hash for the on-disk cache"""
+    # Numba can only cache functions backed by a real source file
+    JIT_CACHE_DIR.mkdir(exist_ok=True)
+    source_path = JIT_CACHE_DIR / f"{hashlib.blake2b(code.encode(), digest_size=16).hexdigest()}.py"
+    if not source_path.exists():
+        source_path.write_text(code, encoding='utf-8')
     
-    if len(result) != len(nodes):
-        raise ValueError("Circular dependency detected in workflow")
+    namespace = {'__name__': f'workflow_jit_{source_path.stem}'}
+    exec(compile(code, str(source_path), 'exec'), namespace)
+    return _load_numba().njit(cache=True)(namespace['run'])
+
+def _execute_jit(code: str, input_data: Any) -> Optional[Dict[str, Any]]:
+    """Run a '# @jit' node; returns None when Numba can't compile it so the caller falls back"""
+    errors = _load_numba().core.errors
+    # Unsupported bytecode (e.g. 'with' blocks) isn't a NumbaError subclass in every release
+    compile_errors = (errors.NumbaError, getattr(errors, 'UnsupportedBytecodeError', errors.NumbaError))
+    try:
+        start_time = time.time()
+        result = _load_jit_run(code)(input_data)
+        execution_time = time.time() - start_time
+    except compile_errors:
+        return None
     
-    # Return nodes in topological order
-    node_map = {node.id: node for node in nodes}
-    return [node_map[node_id] for node_id in result]
+    return {
+        'status': 'success',
+        'output': result,
+        'stdout': '',
+        'stderr': '',
+        'execution_time': execution_time
+    }
 
 def execute_python_code(code: str, input_data: Any) -> Dict[str, Any]:
     """Execute Python code with restrictions"""
     try:
-        # Set memory limit (256 MB)
-        resource.setrlimit(resource.RLIMIT_AS, (256 * 1024 * 1024, 256 * 1024 * 1024))
+        # Numeric nodes can opt in to Numba; anything it can't type runs restricted
+        if ALLOW_NUMBA_JIT and _wants_jit(code) and _load_numba() is not None:
+            jit_result = _execute_jit(code, input_data)
+            if jit_result is not None:
+                return jit_result
         
         # Compile restricted Python code
-        compiled_code = compile_restricted(code, '<string>', 'exec')
+        compiled_code = _compile_py(code)
         if compiled_code is None:
             return {
                 'status': 'error',
@@ -116,12 +190,7 @@ def execute_python_code(code: str, input_data: Any) -> Dict[str, Any]:
             }
         
         # Create safe globals with input data
-        restricted_globals = safe_globals.copy()
-        restricted_globals['input'] = input_data
-        restricted_globals['__builtins__']['_print_'] = lambda *args: print(*args)
-        restricted_globals['__builtins__']['_iter_unpack_sequence_'] = lambda seq, spec=2: seq
-        restricted_globals['__builtins__']['enumerate'] = enumerate
-        restricted_globals['__builtins__']['sorted'] = sorted
+        restricted_globals = {**_BASE_GLOBALS, 'input': input_data}
         
         # Capture stdout/stderr
         import sys
@@ -176,128 +245,343 @@ def execute_python_code(code: str, input_data: Any) -> Dict[str, Any]:
             'stderr': ''
         }
 
+# Python nodes run in a process pool: true parallelism, and the memory
+# limit applies to each worker instead of the API process
+PYTHON_MEMORY_LIMIT = 256 * 1024 * 1024  # 256 MB
+
+def _init_python_worker():
+    """Set the memory limit once per worker process"""
+    resource.setrlimit(resource.RLIMIT_AS, (PYTHON_MEMORY_LIMIT, PYTHON_MEMORY_LIMIT))
+
+def get_python_executor() -> ProcessPoolExecutor:
+    """Return the app-wide Python executor, creating it on first use"""
+    executor = getattr(app.state, 'python_executor', None)
+    if executor is None:
+        executor = ProcessPoolExecutor(max_workers=os.cpu_count(), initializer=_init_python_worker)
+        app.state.python_executor = executor
+    return executor
+
+async def run_python_code(code: str, input_data: Any) -> Dict[str, Any]:
+    """Execute Python code on the process pool without blocking the event loop"""
+    executor = get_python_executor()
+    try:
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, execute_python_code, code, input_data
+        )
+    except BrokenProcessPool:
+        # A worker died (e.g. killed at the memory limit) - replace the pool for later runs
+        app.state.python_executor = None
+        executor.shutdown(wait=False)
+        raise
+
+# Node result cache keyed by (node_type, code, input), bounded LRU with a TTL. Code nodes
+# may fetch URLs, read the clock or draw random numbers, so only nodes with cache: true use it
+_RESULT_CACHE_SIZE = 256
+_RESULT_CACHE_TTL = float(os.getenv('NODE_CACHE_TTL', 300))
+_RESULT_CACHE: "OrderedDict[bytes, tuple]" = OrderedDict()
+
+def _result_cache_key(node_type: str, node_data: Dict[str, Any], input_data: Any) -> Optional[bytes]:
+    """Build a cache key for a node that opted in with cache: true, or None if it must run"""
+    config = node_data.get('config') or {}
+    if node_data.get('cache') is not True and config.get('cache') is not True:
+        return None
+    code = node_data.get('code', '')
+    try:
+        canonical_input = orjson.dumps(
+            input_data, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS
+        )
+    except orjson.JSONEncodeError:
+        return None
+    return hashlib.blake2b(
+        node_type.encode() + b'\0' + code.encode() + b'\0' + canonical_input,
+        digest_size=16
+    ).digest()
+
+def _get_cached_result(key: bytes) -> Optional[Dict[str, Any]]:
+    """Return a copy of a cached node result, or None on miss or expiry"""
+    entry = _RESULT_CACHE.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() - entry[0] > _RESULT_CACHE_TTL:
+        del _RESULT_CACHE[key]
+        return None
+    _RESULT_CACHE.move_to_end(key)
+    result = copy.deepcopy(entry[1])
+    result['execution_time'] = 0.0
+    return result
+
+def _store_cached_result(key: bytes, exec_result: Dict[str, Any]) -> None:
+    """Cache a successful node result if its output is JSON-serializable"""
+    if exec_result.get('status') != 'success':
+        return
+    try:
+        orjson.dumps(exec_result.get('output'), option=orjson.OPT_NON_STR_KEYS)
+    except orjson.JSONEncodeError:
+        return
+    _RESULT_CACHE[key] = (time.monotonic(), copy.deepcopy(exec_result))
+    _RESULT_CACHE.move_to_end(key)
+    if len(_RESULT_CACHE) > _RESULT_CACHE_SIZE:
+        _RESULT_CACHE.popitem(last=False)
+
+# TypeScript stripping patterns, compiled once at import
+_RE_IFACE = re.compile(r'interface\s+\w+\s*\{(?:[^{}]|\{[^{}]*\})*\}', re.MULTILINE | re.DOTALL)
+_RE_RETTYPE = re.compile(r'\)\s*:\s*[A-Za-z_$][\w<>]*(?=\s*\{)')
+_RE_AS_CAST = re.compile(r'\s+as\s+[A-Za-z_$][\w]*(?:<[^>]*>)?')
+_RE_GENERIC = re.compile(r':\s*[A-Za-z_$][\w]*<[^>]*>(?=\s*=)')
+_RE_PARAM_TYPE = re.compile(r'(\w+)\s*:\s*[A-Za-z_$][\w<>\[\]]*(?=\s*[,)])')
+_RE_FUNC_SIG = re.compile(r'function\s+\w+\s*\([^)]*\)')
+_RE_ARROW_SIG = re.compile(r'\w+\s*\([^)]*\)\s*=>')
+_RE_MULTI_NL = re.compile(r'\n\s*\n\s*\n')
+_RE_LEAD_NL = re.compile(r'^\s*\n')
+
+# Matches wherever one of the type-stripping passes could match: interfaces, return types,
+# 'as' casts, generics and annotated names. Code without any of these skips the passes
+_RE_TS_TRIGGER = re.compile(r'interface\s|\)\s*:|\sas\s|:\s*[A-Za-z_$]\w*<|\w\s*:\s*[A-Za-z_$]')
+
+# Hyperscan only handles the interface pattern: the others rely on lookahead,
+# which Hyperscan doesn't support, and each pass depends on the previous output
+if hyperscan is not None:
+    _HS_IFACE_DB = hyperscan.Database(mode=hyperscan.HS_MODE_BLOCK)
+    _HS_IFACE_DB.compile(
+        expressions=[_RE_IFACE.pattern.encode()],
+        ids=[0],
+        elements=1,
+        flags=[hyperscan.HS_FLAG_SOM_LEFTMOST | hyperscan.HS_FLAG_DOTALL]
+    )
+else:
+    _HS_IFACE_DB = None
+
+def _remove_interfaces(ts_code: str) -> str:
+    """Remove interface blocks, using Hyperscan when available"""
+    if _HS_IFACE_DB is None:
+        return _RE_IFACE.sub('', ts_code)
+    
+    data = ts_code.encode('utf-8')
+    spans = []
+    
+    def on_match(match_id, start, end, flags, context):
+        spans.append((start, end))
+    
+    _HS_IFACE_DB.scan(data, match_event_handler=on_match)
+    if not spans:
+        return ts_code
+    
+    # Drop the matched spans in a single pass, skipping overlaps like re.sub would
+    parts = []
+    last_end = 0
+    for start, end in sorted(spans):
+        if start < last_end:
+            continue
+        parts.append(data[last_end:start])
+        last_end = end
+    parts.append(data[last_end:])
+    return b''.join(parts).decode('utf-8')
+
+@functools.lru_cache(maxsize=256)
 def strip_typescript_types(ts_code: str) -> str:
     """Simple TypeScript to JavaScript converter - strips type annotations"""
-    import re
+    # Plain JavaScript has nothing to strip, so only tidy up blank lines
+    if not _RE_TS_TRIGGER.search(ts_code):
+        return _RE_MULTI_NL.sub('\n\n', ts_code).strip()
     
     # Remove interface definitions (complete blocks) - handle nested structures properly
-    js_code = re.sub(r'interface\s+\w+\s*\{(?:[^{}]|\{[^{}]*\})*\}', '', ts_code, flags=re.MULTILINE | re.DOTALL)
+    js_code = _remove_interfaces(ts_code)
     
     # Remove function return type annotations after closing parenthesis
-    js_code = re.sub(r'\)\s*:\s*[A-Za-z_$][\w<>]*(?=\s*\{)', ')', js_code)
+    js_code = _RE_RETTYPE.sub(')', js_code)
     
     # Remove type assertions like 'as Record<string, number>' completely
-    js_code = re.sub(r'\s+as\s+[A-Za-z_$][\w]*(?:<[^>]*>)?', '', js_code)
+    js_code = _RE_AS_CAST.sub('', js_code)
     
     # Remove generic types like Record<string, string> from variable declarations
-    js_code = re.sub(r':\s*[A-Za-z_$][\w]*<[^>]*>(?=\s*=)', '', js_code)
+    js_code = _RE_GENERIC.sub('', js_code)
     
     # Remove parameter type annotations ONLY within function parameter lists
     def remove_param_types(match):
-        func_signature = match.group(0)
         # Only remove type annotations within the parentheses
-        cleaned = re.sub(r'(\w+)\s*:\s*[A-Za-z_$][\w<>\[\]]*(?=\s*[,)])', r'\1', func_signature)
-        return cleaned
+        return _RE_PARAM_TYPE.sub(r'\1', match.group(0))
     
     # Match function signatures and clean their parameters
-    js_code = re.sub(r'function\s+\w+\s*\([^)]*\)', remove_param_types, js_code)
-    js_code = re.sub(r'\w+\s*\([^)]*\)\s*=>', remove_param_types, js_code)
+    js_code = _RE_FUNC_SIG.sub(remove_param_types, js_code)
+    js_code = _RE_ARROW_SIG.sub(remove_param_types, js_code)
     
     # Clean up multiple newlines and extra spaces
-    js_code = re.sub(r'\n\s*\n\s*\n', '\n\n', js_code)
-    js_code = re.sub(r'^\s*\n', '', js_code)
+    js_code = _RE_MULTI_NL.sub('\n\n', js_code)
+    js_code = _RE_LEAD_NL.sub('', js_code)
     
     return js_code.strip()
 
+# Persistent Node.js worker that executes TypeScript nodes (see worker.js)
+NODE_WORKER_SCRIPT = Path(__file__).parent / 'worker.js'
+# Absolute path plus close_fds=False lets subprocess use posix_spawn instead of fork+exec
+NODE_BINARY = shutil.which('node') or 'node'
+NODE_WORKER_FRAME_HEADER = struct.Struct('<I')  # 4-byte little-endian frame length
+
+class NodeWorker:
+    """Long-lived Node.js process running jobs over length-prefixed JSON frames on stdin/stdout"""
+    
+    def __init__(self):
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.reader_task: Optional[asyncio.Task] = None
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.start_lock = asyncio.Lock()
+    
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+    
+    async def start(self):
+        """Spawn the Node process and the background reader that resolves job futures"""
+        self.process = await asyncio.create_subprocess_exec(
+            NODE_BINARY, str(NODE_WORKER_SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            close_fds=False  # Our descriptors are non-inheritable by default, so nothing leaks
+        )
+        self.reader_task = asyncio.create_task(self._read_results(self.process))
+    
+    async def stop(self):
+        """Kill the Node process and fail any jobs still waiting on it"""
+        if self.running:
+            self.process.kill()
+            await self.process.wait()
+        if self.reader_task is not None:
+            self.reader_task.cancel()
+            self.reader_task = None
+        self._fail_pending('Node worker stopped')
+        self.process = None
+    
+    async def _read_results(self, process: asyncio.subprocess.Process):
+        """Dispatch each result frame to the future waiting on its job id"""
+        while True:
+            try:
+                header = await process.stdout.readexactly(NODE_WORKER_FRAME_HEADER.size)
+                (length,) = NODE_WORKER_FRAME_HEADER.unpack(header)
+                body = await process.stdout.readexactly(length)
+            except asyncio.IncompleteReadError:
+                break
+            try:
+                message = orjson.loads(body)
+            except orjson.JSONDecodeError:
+                continue
+            future = self.pending.pop(message.get('id'), None)
+            if future is not None and not future.done():
+                future.set_result(message)
+        self._fail_pending('Node worker exited unexpectedly')
+    
+    def _fail_pending(self, reason: str):
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError(reason))
+        self.pending.clear()
+    
+    async def run(self, code: str, input_data: Any, timeout: float = 5.0) -> Dict[str, Any]:
+        """Send one job to the worker and wait for its result"""
+        if not self.running:
+            async with self.start_lock:
+                if not self.running:
+                    await self.start()
+        
+        job_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self.pending[job_id] = future
+        
+        job = orjson.dumps({'id': job_id, 'code': code, 'input': input_data})
+        # Sized frames let both sides read large payloads in one go instead of scanning for newlines
+        self.process.stdin.write(NODE_WORKER_FRAME_HEADER.pack(len(job)) + job)
+        await self.process.stdin.drain()
+        
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            # The job may be stuck in a loop, so restart the worker rather than reuse it
+            self.pending.pop(job_id, None)
+            await self.stop()
+            raise
+
+class NodeWorkerPool:
+    """Fixed-size pool of Node workers handed out through an asyncio.Queue"""
+    
+    def __init__(self, size: int):
+        self.workers = [NodeWorker() for _ in range(size)]
+        self.idle: asyncio.Queue = asyncio.Queue()
+        for worker in self.workers:
+            self.idle.put_nowait(worker)
+    
+    async def start(self):
+        await asyncio.gather(*(worker.start() for worker in self.workers))
+    
+    async def stop(self):
+        await asyncio.gather(*(worker.stop() for worker in self.workers))
+    
+    @asynccontextmanager
+    async def acquire(self):
+        """Borrow an idle worker for the duration of one job"""
+        worker = await self.idle.get()
+        try:
+            yield worker
+        finally:
+            self.idle.put_nowait(worker)
+
+NODE_WORKER_POOL_SIZE = int(os.getenv('NODE_WORKER_POOL_SIZE', os.cpu_count() or 1))
+
+def get_node_pool() -> NodeWorkerPool:
+    """Return the app-wide Node worker pool, creating it if startup hasn't run"""
+    pool = getattr(app.state, 'node_pool', None)
+    if pool is None:
+        pool = NodeWorkerPool(NODE_WORKER_POOL_SIZE)
+        app.state.node_pool = pool
+    return pool
+
+@app.on_event("startup")
+async def start_node_pool():
+    try:
+        await get_node_pool().start()
+    except OSError as e:
+        # Node.js missing - TypeScript nodes will report the error when they run
+        logger.warning("Could not start Node.js workers: %s", e)
+
+@app.on_event("shutdown")
+async def stop_node_pool():
+    await get_node_pool().stop()
+
+@app.on_event("shutdown")
+async def stop_python_executor():
+    executor = getattr(app.state, 'python_executor', None)
+    if executor is not None:
+        executor.shutdown(wait=False, cancel_futures=True)
+
 async def execute_typescript_code(code: str, input_data: Any) -> Dict[str, Any]:
     """Execute TypeScript code using Node.js (converts TS to JS first)"""
     try:
         # Convert TypeScript to JavaScript
         js_code = strip_typescript_types(code)
         
-        # Create temporary file
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as f:
-            # Wrap the code to handle input/output
-            wrapped_code = f"""
-{js_code}
-
-// Input data
-const input = {json.dumps(input_data)};
-
-// Execute and capture result
-(async () => {{
-    try {{
-        const result = await run(input);
-        console.log(JSON.stringify({{ success: true, result }}));
-    }} catch (error) {{
-        console.error(JSON.stringify({{ success: false, error: error.message }}));
-    }}
-}})();
-"""
-            f.write(wrapped_code)
-            temp_path = f.name
+        # Execute on an idle worker from the persistent Node.js pool
+        start_time = time.time()
+        async with get_node_pool().acquire() as worker:
+            result_data = await worker.run(js_code, input_data, timeout=5.0)
+        execution_time = time.time() - start_time
         
-        try:
-            # Execute with Node.js
-            start_time = time.time()
-            process = await asyncio.create_subprocess_exec(
-                'node', temp_path,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(), timeout=5.0
-            )
-            
-            execution_time = time.time() - start_time
-            
-            stdout_str = stdout.decode('utf-8')
-            stderr_str = stderr.decode('utf-8')
-            
-            # Parse the result
-            try:
-                if stdout_str.strip():
-                    result_data = json.loads(stdout_str.strip().split('\n')[-1])
-                    if result_data.get('success'):
-                        return {
-                            'status': 'success',
-                            'output': result_data['result'],
-                            'stdout': stdout_str,
-                            'stderr': stderr_str,
-                            'execution_time': execution_time
-                        }
-                    else:
-                        return {
-                            'status': 'error',
-                            'error': result_data.get('error', 'Unknown error'),
-                            'output': None,
-                            'stdout': stdout_str,
-                            'stderr': stderr_str
-                        }
-                else:
-                    return {
-                        'status': 'error',
-                        'error': 'No output from TypeScript execution',
-                        'output': None,
-                        'stdout': stdout_str,
-                        'stderr': stderr_str
-                    }
-            except json.JSONDecodeError:
-                return {
-                    'status': 'error',
-                    'error': 'Failed to parse execution result',
-                    'output': None,
-                    'stdout': stdout_str,
-                    'stderr': stderr_str
-                }
-            
-        finally:
-            # Clean up temp file
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
+        stdout_str = result_data.get('stdout', '')
+        stderr_str = result_data.get('stderr', '')
+        
+        if result_data.get('success'):
+            return {
+                'status': 'success',
+                'output': result_data.get('result'),
+                'stdout': stdout_str,
+                'stderr': stderr_str,
+                'execution_time': execution_time
+            }
+        else:
+            return {
+                'status': 'error',
+                'error': result_data.get('error', 'Unknown error'),
+                'output': None,
+                'stdout': stdout_str,
+                'stderr': stderr_str
+            }
                 
     except asyncio.TimeoutError:
         return {
@@ -320,23 +604,18 @@ const input = {json.dumps(input_data)};
 async def run_workflow(request: dict):
     """Execute a workflow"""
     try:
-        print("=== DEBUGGING WORKFLOW EXECUTION ===")
-        print(f"Raw request: {request}")
-        print(f"Request type: {type(request)}")
+        logger.debug("Raw request: %s", request)
         
         workflow = request.get('workflow', {})
-        print(f"Workflow: {workflow}")
-        print(f"Workflow type: {type(workflow)}")
         
         start_time = time.time()
         
         # Parse nodes
         nodes = []
         nodes_data = workflow.get('nodes', {})
-        print(f"Nodes data: {nodes_data}")
         
         for node_id, node_data in nodes_data.items():
-            print(f"Processing node {node_id}: {node_data}")
+            logger.debug("Processing node %s: %s", node_id, node_data)
             nodes.append({
                 'id': node_id,
                 'data': node_data
@@ -345,10 +624,9 @@ async def run_workflow(request: dict):
         # Parse connections
         connections = []
         connections_data = workflow.get('connections', {})
-        print(f"Connections data: {connections_data}")
         
         for conn_id, conn_data in connections_data.items():
-            print(f"Processing connection {conn_id}: {conn_data}")
+            logger.debug("Processing connection %s: %s", conn_id, conn_data)
             if isinstance(conn_data, dict):
                 connections.append({
                     'id': conn_id,
@@ -358,28 +636,32 @@ async def run_workflow(request: dict):
                     'targetInput': conn_data['targetInput']
                 })
         
-        print(f"Parsed {len(nodes)} nodes and {len(connections)} connections")
+        logger.debug("Parsed %d nodes and %d connections", len(nodes), len(connections))
+        
+        # Group nodes into levels; nodes within a level run concurrently
+        levels = topological_sort(
+            [Node(**node) for node in nodes],
+            [Connection(**conn) for conn in connections]
+        )
         
-        # Execute nodes in simple order (for now, skip topological sort)
         node_results = []
         node_outputs = {}
         
-        print("Starting node execution...")
-        for node in nodes:
-            node_id = node['id']
-            node_data = node['data']
+        # Map each node to the source feeding it (a node uses one inbound connection)
+        incoming_first = {conn['target']: conn['source'] for conn in connections}
+        
+        async def execute_node(node: Node) -> Dict[str, Any]:
+            """Execute a single node and store its output for downstream nodes"""
+            node_id = node.id
+            node_data = node.data
             node_type = node_data.get('type', '')
             
-            print(f"Executing node {node_id} of type {node_type}")
+            logger.debug("Executing node %s of type %s", node_id, node_type)
             
             # Determine input for this node
-            input_data = {}
-            for conn in connections:
-                if conn['target'] == node_id:
-                    source_output = node_outputs.get(conn['source'])
-                    if source_output is not None:
-                        input_data = source_output
-                        break
+            input_data = node_outputs.get(incoming_first.get(node_id))
+            if input_data is None:
+                input_data = {}
             
             result = {
                 'id': node_id,
@@ -391,8 +673,20 @@ async def run_workflow(request: dict):
                 'error': None
             }
             
+            # Reuse a previous result when a cache: true node sees the same input again
+            cache_key = None
+            cached_result = None
+            if node_type not in ('start', 'end'):
+                cache_key = _result_cache_key(node_type, node_data, input_data)
+                if cache_key is not None:
+                    cached_result = _get_cached_result(cache_key)
+            
             try:
-                if node_type == 'start':
+                if cached_result is not None:
+                    logger.debug("Using cached result for node %s", node_id)
+                    exec_result = cached_result
+                    
+                elif node_type == 'start':
                     exec_result = {
                         'status': 'success',
                         'output': {'message': 'Workflow started'},
@@ -412,12 +706,12 @@ async def run_workflow(request: dict):
                     
                 elif node_type == 'python':
                     code = node_data.get('code', 'def run(input):\n    return input')
-                    print(f"Executing Python code: {code}")
-                    exec_result = execute_python_code(code, input_data)
+                    logger.debug("Executing Python code: %s", code)
+                    exec_result = await run_python_code(code, input_data)
                     
                 elif node_type == 'typescript':
                     code = node_data.get('code', 'async function run(input: any): Promise<any> {\n    return input;\n}')
-                    print(f"Executing TypeScript code: {code}")
+                    logger.debug("Executing TypeScript code: %s", code)
                     exec_result = await execute_typescript_code(code, input_data)
                     
                 else:
@@ -429,23 +723,30 @@ async def run_workflow(request: dict):
                         'stderr': ''
                     }
                 
+                if cache_key is not None and cached_result is None:
+                    _store_cached_result(cache_key, exec_result)
+                
                 # Update result
                 result.update(exec_result)
                 
                 # Store output for next nodes
                 node_outputs[node_id] = exec_result['output']
-                print(f"Node {node_id} completed with status: {exec_result['status']}")
+                logger.debug("Node %s completed with status: %s", node_id, exec_result['status'])
                 
             except Exception as e:
-                print(f"Error executing node {node_id}: {e}")
+                logger.exception("Error executing node %s", node_id)
                 result['status'] = 'error'
                 result['error'] = str(e)
                 node_outputs[node_id] = None
             
-            node_results.append(result)
+            return result
+        
+        for level in levels:
+            level_results = await asyncio.gather(*(execute_node(node) for node in level))
+            node_results.extend(level_results)
             
-            # Stop execution if a node failed
-            if result['status'] == 'error':
+            # Stop execution if any node in this level failed
+            if any(result['status'] == 'error' for result in level_results):
                 break
         
         total_time = time.time() - start_time
@@ -466,13 +767,11 @@ async def run_workflow(request: dict):
             'error': overall_error
         }
         
-        print(f"Final result: {final_result}")
+        logger.debug("Final result: %s", final_result)
         return final_result
         
     except Exception as e:
-        print(f"Workflow execution error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Workflow execution error")
         
         return {
             'status': 'error',
@@ -1,13 +1,34 @@
 import asyncio
+import base64
+import codecs
+import copy
+import functools
+import hashlib
+import io
 import json
+import logging
+import multiprocessing
+import operator
 import os
+import queue
+import random
 import resource
+import shutil
+import signal
+import struct
 import subprocess
-import tempfile
+import sys
+import threading
 import time
-from typing import Any, Dict, List, Optional
+import uuid
+from collections import OrderedDict, deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from types import MappingProxyType
+from typing import Any, Callable, Dict, List, Optional
 import aiohttp
 import aiofiles
+from yarl import URL
 try:
     # Try to use pysqlite3 which supports extension loading
     # Install with: pip install pysqlite3-binary (may require building from source on some platforms)
@@ -17,59 +38,478 @@ except ImportError:
     # Fall back to standard sqlite3 (may not support extensions)
     import sqlite3
     _HAS_EXTENSION_SUPPORT = hasattr(sqlite3.Connection, 'enable_load_extension')
+try:
+    # orjson is several times faster than json for large payloads
+    import orjson
+except ImportError:
+    orjson = None
 from pathlib import Path
 from dotenv import load_dotenv
 import re
 import ipaddress
+from urllib.parse import urlparse
 
-from fastapi import FastAPI
+from fastapi import FastAPI, Header
 from fastapi.middleware.cors import CORSMiddleware
-from contextlib import asynccontextmanager
-from RestrictedPython import compile_restricted, safe_globals
+from fastapi.responses import JSONResponse
+from contextlib import asynccontextmanager, contextmanager
 
 # Load environment variables
 load_dotenv()
 
+logger = logging.getLogger("workflow")
+logger.setLevel(os.getenv('LOG_LEVEL', 'INFO').upper())
+if not logger.handlers:
+    # uvicorn only configures its own loggers, so give ours a stderr handler in the same format
+    _log_handler = logging.StreamHandler()
+    _log_handler.setFormatter(logging.Formatter('%(levelname)s:     %(name)s - %(message)s'))
+    logger.addHandler(_log_handler)
+    logger.propagate = False
+
+# JSON helpers for hot paths: orjson when installed, the json module otherwise
+if orjson is not None:
+    def _json_dumps(obj: Any) -> bytes:
+        return orjson.dumps(obj, option=orjson.OPT_NON_STR_KEYS)
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(obj: Any) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+    _json_loads = json.loads
+
+def _json_dumps_str(obj: Any) -> str:
+    """Serialize to a JSON string - used for aiohttp request bodies"""
+    return _json_dumps(obj).decode('utf-8')
+
+def _json_pretty(obj: Any) -> str:
+    """Indented JSON for logs, via orjson when it can encode the value"""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS).decode('utf-8')
+        except TypeError:
+            # e.g. integers beyond 64 bits - let json handle (or reject) them
+            pass
+    return json.dumps(obj, indent=2, ensure_ascii=False)
+
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     """Handle application lifespan events"""
     # Startup
+    get_http_session()
+    try:
+        await get_node_pool().start()
+    except OSError as e:
+        # Node.js missing - TypeScript nodes will report the error when they run
+        logger.warning("Could not start Node.js workers: %s", e)
     yield
     # Shutdown - gracefully handle cancellation
     try:
+        session = getattr(app.state, 'http_session', None)
+        if session is not None:
+            await session.close()
+        _close_sqlite_connections()
+        await get_node_pool().stop()
+        executor = getattr(app.state, 'python_executor', None)
+        if executor is not None:
+            executor.shutdown(wait=False, cancel_futures=True)
         # Give pending tasks a moment to complete
         await asyncio.sleep(0.1)
     except asyncio.CancelledError:
         # This is expected during shutdown, ignore it
         pass
 
-app = FastAPI(lifespan=lifespan)
+class _OrjsonFallbackResponse(JSONResponse):
+    """JSON responses rendered by orjson when installed, falling back to json for values it rejects"""
+    
+    def render(self, content: Any) -> bytes:
+        if orjson is not None:
+            try:
+                return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY)
+            except TypeError:
+                # e.g. integers beyond 64 bits
+                pass
+        return super().render(content)
+
+app = FastAPI(lifespan=lifespan, default_response_class=_OrjsonFallbackResponse)
 
 app.add_middleware(
     CORSMiddleware,
-    allow_origins=[
-        "http://localhost:3000",
-        "http://localhost:3001", 
-        "http://localhost:3002",
-        "http://localhost:3003",
-        "http://localhost:3004",
-        "http://localhost:3005",
-        "http://localhost:3006",
-        "http://localhost:3007",
-        "http://localhost:3008",
-        "http://localhost:3009",
-        "http://localhost:3010"
-    ],
+    # Matches http://localhost:3000 through http://localhost:3010
+    allow_origin_regex=r"^http://localhost:30(0[0-9]|10)$",
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
 )
 
-def execute_python_code(code: str, input_data: Any) -> Dict[str, Any]:
+# Connection pool sizing for the shared HTTP session
+HTTP_CONNECTION_LIMIT = int(os.getenv('HTTP_CONNECTION_LIMIT', 256))
+HTTP_CONNECTION_LIMIT_PER_HOST = int(os.getenv('HTTP_CONNECTION_LIMIT_PER_HOST', 32))
+
+def get_http_session() -> aiohttp.ClientSession:
+    """Return the app-wide HTTP session so requests reuse pooled keep-alive connections"""
+    session = getattr(app.state, 'http_session', None)
+    if session is None or session.closed:
+        session = aiohttp.ClientSession(
+            json_serialize=_json_dumps_str,
+            connector=aiohttp.TCPConnector(
+                limit=HTTP_CONNECTION_LIMIT,
+                limit_per_host=HTTP_CONNECTION_LIMIT_PER_HOST,
+                ttl_dns_cache=300,
+                keepalive_timeout=75,
+                # Abort TLS connections the peer dropped instead of leaking their sockets
+                enable_cleanup_closed=True
+            )
+        )
+        app.state.http_session = session
+    return session
+
+# Modules that restricted Python nodes may import
+_ALLOWED_MODULES = frozenset({
+    'json', 'math', 'random', 'datetime', 'time', 're', 'base64',
+    'hashlib', 'collections', 'itertools', 'functools', 'operator',
+    'statistics', 'decimal', 'fractions', 'uuid', 'string', 'pytz',
+    'calendar', 'copy', 'heapq', 'bisect', 'array', 'enum',
+    'dataclasses', 'typing', 'zoneinfo', 'urllib.parse', 'html',
+    'csv', 'codecs', 'textwrap', 'difflib', 'pprint', 'numpy',
+    'pandas', 'requests', 'urllib', 'urllib.request', 'urllib.error',
+    'markdown',  # For markdown to HTML conversion
+    'bs4',  # BeautifulSoup for HTML parsing
+    'os',  # For environment variable access (os.getenv)
+    'sentence_transformers'  # For embedding generation
+})
+
+# Safe os module wrapper exposed to restricted Python nodes
+class SafeOS:
+    """Safe wrapper for os module - only exposes safe functions and restricts paths to /tmp/workflow_files/"""
+    safe_base = Path('/tmp/workflow_files')
+    
+    @staticmethod
+    def _validate_path(path):
+        """Ensure path is within /tmp/workflow_files/"""
+        path_obj = Path(path)
+        if not path_obj.is_absolute():
+            path_obj = SafeOS.safe_base / path_obj
+        else:
+            try:
+                path_obj.resolve().relative_to(SafeOS.safe_base.resolve())
+            except ValueError:
+                raise PermissionError(f"Path must be within /tmp/workflow_files/: {path}")
+        return str(path_obj.resolve())
+    
+    @staticmethod
+    def getenv(key, default=None):
+        """Get environment variable"""
+        return os.getenv(key, default)
+    
+    class path:
+        """Safe os.path wrapper"""
+        @staticmethod
+        def join(*paths):
+            """Join path components"""
+            return os.path.join(*paths)
+        
+        @staticmethod
+        def exists(path):
+            """Check if path exists (restricted to /tmp/workflow_files/)"""
+            safe_path = SafeOS._validate_path(path)
+            return os.path.exists(safe_path)
+        
+        @staticmethod
+        def isdir(path):
+            """Check if path is a directory (restricted to /tmp/workflow_files/)"""
+            safe_path = SafeOS._validate_path(path)
+            return os.path.isdir(safe_path)
+        
+        @staticmethod
+        def isfile(path):
+            """Check if path is a file (restricted to /tmp/workflow_files/)"""
+            safe_path = SafeOS._validate_path(path)
+            return os.path.isfile(safe_path)
+        
+        @staticmethod
+        def basename(path):
+            """Get basename of path"""
+            return os.path.basename(path)
+        
+        @staticmethod
+        def dirname(path):
+            """Get dirname of path"""
+            return os.path.dirname(path)
+        
+        @staticmethod
+        def splitext(path):
+            """Split path into (root, ext)"""
+            return os.path.splitext(path)
+        
+        @staticmethod
+        def abspath(path):
+            """Get absolute path (restricted to /tmp/workflow_files/)"""
+            safe_path = SafeOS._validate_path(path)
+            return os.path.abspath(safe_path)
+        
+        @staticmethod
+        def getsize(path):
+            """Get file size (restricted to /tmp/workflow_files/)"""
+            safe_path = SafeOS._validate_path(path)
+            return os.path.getsize(safe_path)
+    
+    @staticmethod
+    def listdir(path='.'):
+        """List directory contents (restricted to /tmp/workflow_files/)"""
+        if path == '.':
+            safe_path = str(SafeOS.safe_base)
+        else:
+            safe_path = SafeOS._validate_path(path)
+        return os.listdir(safe_path)
+
+_SAFE_OS = SafeOS()
+
+def _safe_import(name, globals=None, locals=None, fromlist=(), level=0):
+    if name not in _ALLOWED_MODULES:
+        raise ImportError(f"Module '{name}' is not allowed")
+    
+    # Special handling for os module - return safe wrapper
+    if name == 'os':
+        return _SAFE_OS
+    
+    # Special handling for os.path - return safe wrapper's path
+    if name == 'os.path' or (name == 'os' and fromlist and 'path' in fromlist):
+        return _SAFE_OS.path
+    
+    return __import__(name, globals, locals, fromlist, level)
+
+# RestrictedPython guard hooks
+# _getitem_ handles item access like obj[index]
+def _getitem_handler(obj, index, *args):
+    """Handle item access for RestrictedPython"""
+    return obj[index]
+# _iter_unpack_sequence_ handles sequence unpacking
+def _iter_unpack_handler(seq, *args):
+    """Handle sequence unpacking for RestrictedPython"""
+    return seq
+# Required for augmented assignments and complex expressions in f-strings
+# _inplacevar_ handles in-place operations (like +=, -=, etc.)
+# RestrictedPython calls it with (operation, variable_name, value)
+def _inplacevar_handler(*args, **kwargs):
+    """Handle in-place operations for RestrictedPython"""
+    # RestrictedPython transforms in-place ops like x += y into _inplacevar_('+', 'x', y)
+    # We just need to return the value - the actual operation is handled by RestrictedPython
+    if len(args) >= 3:
+        return args[2]  # Return the value (third argument)
+    elif len(args) >= 1:
+        return args[-1]  # Fallback: return last argument
+    return None
+# _write_ handles write operations to variables (list of (name, value) tuples)
+def _write_handler(*args, **kwargs):
+    """Handle write operations for RestrictedPython"""
+    # RestrictedPython uses this to track variable writes
+    # We don't need to do anything special here
+    pass
+
+# Safe file operations exposed to restricted code (only allow /tmp/workflow_files/)
+def _safe_makedirs(path, exist_ok=False):
+    """Safely create directories, only within /tmp/workflow_files/"""
+    safe_base = Path('/tmp/workflow_files')
+    path_obj = Path(path)
+    
+    # Resolve to absolute path
+    if not path_obj.is_absolute():
+        path_obj = safe_base / path_obj
+    else:
+        # Ensure it's within safe_base
+        try:
+            path_obj.resolve().relative_to(safe_base.resolve())
+        except ValueError:
+            raise PermissionError(f"Path must be within /tmp/workflow_files/: {path}")
+    
+    path_obj.mkdir(parents=True, exist_ok=exist_ok)
+    return str(path_obj)
+
+def _safe_write_file(file_path, content, mode='w', encoding='utf-8'):
+    """Safely write files, only within /tmp/workflow_files/"""
+    safe_base = Path('/tmp/workflow_files')
+    path_obj = Path(file_path)
+    
+    # Resolve to absolute path
+    if not path_obj.is_absolute():
+        path_obj = safe_base / path_obj
+    else:
+        # Ensure it's within safe_base
+        try:
+            path_obj.resolve().relative_to(safe_base.resolve())
+        except ValueError:
+            raise PermissionError(f"Path must be within /tmp/workflow_files/: {file_path}")
+    
+    # Create parent directories if needed
+    path_obj.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Write file
+    if 'b' in mode:
+        with open(path_obj, mode) as f:
+            f.write(content)
+    else:
+        with open(path_obj, mode, encoding=encoding) as f:
+            f.write(content)
+    
+    return str(path_obj)
+
+def _safe_open(file_path, mode='r', encoding=None, **kwargs):
+    """Safely open files, only within /tmp/workflow_files/ - works like standard open()"""
+    safe_base = Path('/tmp/workflow_files')
+    path_obj = Path(file_path)
+    
+    # Resolve to absolute path
+    if not path_obj.is_absolute():
+        path_obj = safe_base / path_obj
+    else:
+        # Ensure it's within safe_base
+        try:
+            path_obj.resolve().relative_to(safe_base.resolve())
+        except ValueError:
+            raise PermissionError(f"Path must be within /tmp/workflow_files/: {file_path}")
+    
+    # Create parent directories if writing
+    if 'w' in mode or 'a' in mode or 'x' in mode:
+        path_obj.parent.mkdir(parents=True, exist_ok=True)
+    
+    # Open file with standard open() - path is now validated
+    if encoding:
+        return open(path_obj, mode, encoding=encoding, **kwargs)
+    else:
+        return open(path_obj, mode, **kwargs)
+
+# Markdown to HTML conversion helper
+try:
+    import markdown
+    def _markdown_to_html(md_text: str) -> str:
+        """Convert markdown text to HTML"""
+        if not isinstance(md_text, str):
+            return str(md_text)
+        return markdown.markdown(md_text, extensions=['fenced_code', 'tables', 'toc'])
+except ImportError:
+    # If markdown library not available, provide a simple fallback
+    _MARKDOWN_FALLBACK_RULES = (
+        (re.compile(r'^# (.+)$', re.MULTILINE), r'<h1>\1</h1>'),
+        (re.compile(r'^## (.+)$', re.MULTILINE), r'<h2>\1</h2>'),
+        (re.compile(r'^### (.+)$', re.MULTILINE), r'<h3>\1</h3>'),
+        (re.compile(r'\*\*(.+?)\*\*'), r'<strong>\1</strong>'),
+        (re.compile(r'\*(.+?)\*'), r'<em>\1</em>'),
+    )
+    
+    def _markdown_to_html(md_text: str) -> str:
+        """Simple markdown to HTML conversion (fallback)"""
+        if not isinstance(md_text, str):
+            return str(md_text)
+        # Basic conversions
+        html = md_text
+        for pattern, replacement in _MARKDOWN_FALLBACK_RULES:
+            html = pattern.sub(replacement, html)
+        html = html.replace('\n', '<br>\n')
+        return f'<div>{html}</div>'
+
+def _build_restricted_globals() -> Dict[str, Any]:
+    """Build the restricted globals template shared by every Python node execution"""
+    from RestrictedPython import safe_globals
+    from RestrictedPython.PrintCollector import PrintCollector
+    
+    restricted_globals = safe_globals.copy()
+    
+    restricted_globals['__import__'] = _safe_import
+    # Also make safe_os available directly
+    restricted_globals['os'] = _SAFE_OS
+    restricted_globals['_print_'] = PrintCollector
+    restricted_globals['_getattr_'] = getattr
+    restricted_globals['_getitem_'] = _getitem_handler
+    restricted_globals['_getiter_'] = iter
+    restricted_globals['_iter_unpack_sequence_'] = _iter_unpack_handler
+    restricted_globals['_inplacevar_'] = _inplacevar_handler
+    restricted_globals['_write_'] = _write_handler
+    
+    # Make 'open' point to safe_open in restricted environment
+    restricted_globals['open'] = _safe_open
+    restricted_globals['safe_makedirs'] = _safe_makedirs
+    restricted_globals['safe_write_file'] = _safe_write_file
+    
+    # Add essential built-in types and functions
+    restricted_globals['dict'] = dict
+    restricted_globals['list'] = list
+    restricted_globals['tuple'] = tuple
+    restricted_globals['set'] = set
+    restricted_globals['str'] = str
+    restricted_globals['int'] = int
+    restricted_globals['float'] = float
+    restricted_globals['bool'] = bool
+    restricted_globals['len'] = len
+    restricted_globals['min'] = min
+    restricted_globals['max'] = max
+    restricted_globals['sum'] = sum
+    restricted_globals['abs'] = abs
+    restricted_globals['round'] = round
+    restricted_globals['range'] = range
+    restricted_globals['enumerate'] = enumerate
+    restricted_globals['zip'] = zip
+    restricted_globals['isinstance'] = isinstance
+    restricted_globals['type'] = type
+    restricted_globals['hasattr'] = hasattr
+    restricted_globals['sorted'] = sorted
+    
+    restricted_globals['markdown_to_html'] = _markdown_to_html
+    
+    # Patch a copy of __builtins__ so RestrictedPython's shared safe_builtins stays untouched
+    builtins = restricted_globals.get('__builtins__', {})
+    if isinstance(builtins, dict):
+        builtins = dict(builtins)
+        builtins['__import__'] = _safe_import
+        builtins['_print_'] = PrintCollector
+        builtins['dict'] = dict
+        builtins['list'] = list
+        builtins['isinstance'] = isinstance
+    restricted_globals['__builtins__'] = builtins
+    
+    return restricted_globals
+
+# RestrictedPython is imported on first use, so only the Python worker processes load it.
+# The globals template is then built once per process instead of per call.
+@functools.lru_cache(maxsize=None)
+def _restricted_globals_template() -> Dict[str, Any]:
+    """Return the restricted globals template, building it on first use"""
+    return _build_restricted_globals()
+
+@functools.lru_cache(maxsize=512)
+def _compile_restricted_cached(code: str):
+    """Compile restricted Python code, cached so re-run nodes skip the AST transform"""
+    from RestrictedPython import compile_restricted
+    return compile_restricted(code, '<string>', 'exec')
+
+# Per-run wall-clock limit and per-worker address-space cap for Python nodes (0 disables)
+PYTHON_NODE_TIMEOUT = int(os.getenv('PYTHON_NODE_TIMEOUT', 300))
+PYTHON_NODE_MEMORY_MB = int(os.getenv('PYTHON_NODE_MEMORY_MB', 0))
+# Set in worker processes whose SIGALRM handler enforces PYTHON_NODE_TIMEOUT
+_PYTHON_ALARM = False
+
+# Extra seconds the server waits past PYTHON_NODE_TIMEOUT before killing a stuck worker
+PYTHON_NODE_TIMEOUT_GRACE = 5
+
+class _PythonNodeTimeout(BaseException):
+    """Raised by SIGALRM in a Python worker - skips except Exception, though a bare except still catches it"""
+
+def _on_python_node_timeout(signum, frame):
+    raise _PythonNodeTimeout()
+
+def _init_python_worker():
+    """Install the timeout handler and memory cap in each Python worker process"""
+    global _PYTHON_ALARM
+    if PYTHON_NODE_MEMORY_MB > 0:
+        limit = PYTHON_NODE_MEMORY_MB * 1024 * 1024
+        resource.setrlimit(resource.RLIMIT_AS, (limit, limit))
+    if PYTHON_NODE_TIMEOUT > 0 and hasattr(signal, 'SIGALRM'):
+        signal.signal(signal.SIGALRM, _on_python_node_timeout)
+        _PYTHON_ALARM = True
+
+def _execute_python_code_sync(code: str, input_data: Any) -> Dict[str, Any]:
     """Execute Python code with restrictions"""
     try:
-        # Compile restricted Python code
-        compiled_code = compile_restricted(code, '<string>', 'exec')
+        # Compile restricted Python code (cached by source)
+        compiled_code = _compile_restricted_cached(code)
         if compiled_code is None:
             return {
                 'status': 'error',
@@ -79,345 +519,66 @@ def execute_python_code(code: str, input_data: Any) -> Dict[str, Any]:
                 'stderr': ''
             }
         
-        # Create safe globals with input data and import capabilities
-        restricted_globals = safe_globals.copy()
+        # Copy the prebuilt globals template and add this call's input
+        restricted_globals = _restricted_globals_template().copy()
         restricted_globals['input'] = input_data
         
-        # Add safe import functionality
-        allowed_modules = {
-            'json', 'math', 'random', 'datetime', 'time', 're', 'base64',
-            'hashlib', 'collections', 'itertools', 'functools', 'operator',
-            'statistics', 'decimal', 'fractions', 'uuid', 'string', 'pytz',
-            'calendar', 'copy', 'heapq', 'bisect', 'array', 'enum',
-            'dataclasses', 'typing', 'zoneinfo', 'urllib.parse', 'html',
-            'csv', 'codecs', 'textwrap', 'difflib', 'pprint', 'numpy',
-            'pandas', 'requests', 'urllib', 'urllib.request', 'urllib.error',
-            'markdown',  # For markdown to HTML conversion
-            'bs4',  # BeautifulSoup for HTML parsing
-            'os',  # For environment variable access (os.getenv)
-            'sentence_transformers'  # For embedding generation
-        }
-        
-        # Create safe os module wrapper
-        import os as real_os
-        from os import path as real_path
-        
-        class SafeOS:
-            """Safe wrapper for os module - only exposes safe functions and restricts paths to /tmp/workflow_files/"""
-            safe_base = Path('/tmp/workflow_files')
-            
-            @staticmethod
-            def _validate_path(path):
-                """Ensure path is within /tmp/workflow_files/"""
-                path_obj = Path(path)
-                if not path_obj.is_absolute():
-                    path_obj = SafeOS.safe_base / path_obj
-                else:
-                    try:
-                        path_obj.resolve().relative_to(SafeOS.safe_base.resolve())
-                    except ValueError:
-                        raise PermissionError(f"Path must be within /tmp/workflow_files/: {path}")
-                return str(path_obj.resolve())
-            
-            @staticmethod
-            def getenv(key, default=None):
-                """Get environment variable"""
-                return real_os.getenv(key, default)
-            
-            class path:
-                """Safe os.path wrapper"""
-                @staticmethod
-                def join(*paths):
-                    """Join path components"""
-                    return real_path.join(*paths)
-                
-                @staticmethod
-                def exists(path):
-                    """Check if path exists (restricted to /tmp/workflow_files/)"""
-                    safe_path = SafeOS._validate_path(path)
-                    return real_path.exists(safe_path)
-                
-                @staticmethod
-                def isdir(path):
-                    """Check if path is a directory (restricted to /tmp/workflow_files/)"""
-                    safe_path = SafeOS._validate_path(path)
-                    return real_path.isdir(safe_path)
-                
-                @staticmethod
-                def isfile(path):
-                    """Check if path is a file (restricted to /tmp/workflow_files/)"""
-                    safe_path = SafeOS._validate_path(path)
-                    return real_path.isfile(safe_path)
-                
-                @staticmethod
-                def basename(path):
-                    """Get basename of path"""
-                    return real_path.basename(path)
-                
-                @staticmethod
-                def dirname(path):
-                    """Get dirname of path"""
-                    return real_path.dirname(path)
-                
-                @staticmethod
-                def splitext(path):
-                    """Split path into (root, ext)"""
-                    return real_path.splitext(path)
-                
-                @staticmethod
-                def abspath(path):
-                    """Get absolute path (restricted to /tmp/workflow_files/)"""
-                    safe_path = SafeOS._validate_path(path)
-                    return real_path.abspath(safe_path)
-                
-                @staticmethod
-                def getsize(path):
-                    """Get file size (restricted to /tmp/workflow_files/)"""
-                    safe_path = SafeOS._validate_path(path)
-                    return real_path.getsize(safe_path)
-            
-            @staticmethod
-            def listdir(path='.'):
-                """List directory contents (restricted to /tmp/workflow_files/)"""
-                if path == '.':
-                    safe_path = str(SafeOS.safe_base)
-                else:
-                    safe_path = SafeOS._validate_path(path)
-                return real_os.listdir(safe_path)
-        
-        safe_os = SafeOS()
-        
-        def safe_import(name, globals=None, locals=None, fromlist=(), level=0):
-            if name not in allowed_modules:
-                raise ImportError(f"Module '{name}' is not allowed")
-            
-            # Special handling for os module - return safe wrapper
-            if name == 'os':
-                return safe_os
-            
-            # Special handling for os.path - return safe wrapper's path
-            if name == 'os.path' or (name == 'os' and fromlist and 'path' in fromlist):
-                return safe_os.path
-            
-            return __import__(name, globals, locals, fromlist, level)
-        
-        # Import proper RestrictedPython print support
+        # Capture print() through RestrictedPython - every function scope shares one collector
         from RestrictedPython.PrintCollector import PrintCollector
-        
-        restricted_globals['__import__'] = safe_import
-        # Also make safe_os available directly
-        restricted_globals['os'] = safe_os
-        restricted_globals['_print_'] = PrintCollector
-        restricted_globals['_getattr_'] = getattr
-        # _getitem_ handles item access like obj[index]
-        def _getitem_handler(obj, index, *args):
-            """Handle item access for RestrictedPython"""
-            return obj[index]
-        restricted_globals['_getitem_'] = _getitem_handler
-        restricted_globals['_getiter_'] = iter
-        # _iter_unpack_sequence_ handles sequence unpacking
-        def _iter_unpack_handler(seq, *args):
-            """Handle sequence unpacking for RestrictedPython"""
-            return seq
-        restricted_globals['_iter_unpack_sequence_'] = _iter_unpack_handler
-        # Required for augmented assignments and complex expressions in f-strings
-        # _inplacevar_ handles in-place operations (like +=, -=, etc.)
-        # RestrictedPython calls it with (operation, variable_name, value)
-        def _inplacevar_handler(*args, **kwargs):
-            """Handle in-place operations for RestrictedPython"""
-            # RestrictedPython transforms in-place ops like x += y into _inplacevar_('+', 'x', y)
-            # We just need to return the value - the actual operation is handled by RestrictedPython
-            if len(args) >= 3:
-                return args[2]  # Return the value (third argument)
-            elif len(args) >= 1:
-                return args[-1]  # Fallback: return last argument
-            return None
-        restricted_globals['_inplacevar_'] = _inplacevar_handler
-        # _write_ handles write operations to variables (list of (name, value) tuples)
-        def _write_handler(*args, **kwargs):
-            """Handle write operations for RestrictedPython"""
-            # RestrictedPython uses this to track variable writes
-            # We don't need to do anything special here
-            pass
-        restricted_globals['_write_'] = _write_handler
-        
-        # Add safe file operations (only allow /tmp/workflow_files/)
-        def safe_makedirs(path, exist_ok=False):
-            """Safely create directories, only within /tmp/workflow_files/"""
-            safe_base = Path('/tmp/workflow_files')
-            path_obj = Path(path)
-            
-            # Resolve to absolute path
-            if not path_obj.is_absolute():
-                path_obj = safe_base / path_obj
-            else:
-                # Ensure it's within safe_base
-                try:
-                    path_obj.resolve().relative_to(safe_base.resolve())
-                except ValueError:
-                    raise PermissionError(f"Path must be within /tmp/workflow_files/: {path}")
-            
-            path_obj.mkdir(parents=True, exist_ok=exist_ok)
-            return str(path_obj)
-        
-        def safe_write_file(file_path, content, mode='w', encoding='utf-8'):
-            """Safely write files, only within /tmp/workflow_files/"""
-            safe_base = Path('/tmp/workflow_files')
-            path_obj = Path(file_path)
-            
-            # Resolve to absolute path
-            if not path_obj.is_absolute():
-                path_obj = safe_base / path_obj
-            else:
-                # Ensure it's within safe_base
-                try:
-                    path_obj.resolve().relative_to(safe_base.resolve())
-                except ValueError:
-                    raise PermissionError(f"Path must be within /tmp/workflow_files/: {file_path}")
-            
-            # Create parent directories if needed
-            path_obj.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Write file
-            if 'b' in mode:
-                with open(path_obj, mode) as f:
-                    f.write(content)
-            else:
-                with open(path_obj, mode, encoding=encoding) as f:
-                    f.write(content)
-            
-            return str(path_obj)
-        
-        def safe_open(file_path, mode='r', encoding=None, **kwargs):
-            """Safely open files, only within /tmp/workflow_files/ - works like standard open()"""
-            safe_base = Path('/tmp/workflow_files')
-            path_obj = Path(file_path)
-            
-            # Resolve to absolute path
-            if not path_obj.is_absolute():
-                path_obj = safe_base / path_obj
-            else:
-                # Ensure it's within safe_base
-                try:
-                    path_obj.resolve().relative_to(safe_base.resolve())
-                except ValueError:
-                    raise PermissionError(f"Path must be within /tmp/workflow_files/: {file_path}")
-            
-            # Create parent directories if writing
-            if 'w' in mode or 'a' in mode or 'x' in mode:
-                path_obj.parent.mkdir(parents=True, exist_ok=True)
-            
-            # Open file with standard open() - path is now validated
-            if encoding:
-                return open(path_obj, mode, encoding=encoding, **kwargs)
-            else:
-                return open(path_obj, mode, **kwargs)
-        
-        # Make 'open' point to safe_open in restricted environment
-        restricted_globals['open'] = safe_open
-        restricted_globals['safe_makedirs'] = safe_makedirs
-        restricted_globals['safe_write_file'] = safe_write_file
-        
-        # Add essential built-in types and functions
-        restricted_globals['dict'] = dict
-        restricted_globals['list'] = list
-        restricted_globals['tuple'] = tuple
-        restricted_globals['set'] = set
-        restricted_globals['str'] = str
-        restricted_globals['int'] = int
-        restricted_globals['float'] = float
-        restricted_globals['bool'] = bool
-        restricted_globals['len'] = len
-        restricted_globals['min'] = min
-        restricted_globals['max'] = max
-        restricted_globals['sum'] = sum
-        restricted_globals['abs'] = abs
-        restricted_globals['round'] = round
-        restricted_globals['range'] = range
-        restricted_globals['enumerate'] = enumerate
-        restricted_globals['zip'] = zip
-        restricted_globals['isinstance'] = isinstance
-        restricted_globals['type'] = type
-        restricted_globals['hasattr'] = hasattr
-        restricted_globals['sorted'] = sorted
-        
-        # Add markdown to HTML conversion helper
-        try:
-            import markdown
-            def markdown_to_html(md_text: str) -> str:
-                """Convert markdown text to HTML"""
-                if not isinstance(md_text, str):
-                    return str(md_text)
-                return markdown.markdown(md_text, extensions=['fenced_code', 'tables', 'toc'])
-            restricted_globals['markdown_to_html'] = markdown_to_html
-        except ImportError:
-            # If markdown library not available, provide a simple fallback
-            def markdown_to_html(md_text: str) -> str:
-                """Simple markdown to HTML conversion (fallback)"""
-                if not isinstance(md_text, str):
-                    return str(md_text)
-                # Basic conversions
-                import re
-                html = md_text
-                html = re.sub(r'^# (.+)$', r'<h1>\1</h1>', html, flags=re.MULTILINE)
-                html = re.sub(r'^## (.+)$', r'<h2>\1</h2>', html, flags=re.MULTILINE)
-                html = re.sub(r'^### (.+)$', r'<h3>\1</h3>', html, flags=re.MULTILINE)
-                html = re.sub(r'\*\*(.+?)\*\*', r'<strong>\1</strong>', html)
-                html = re.sub(r'\*(.+?)\*', r'<em>\1</em>', html)
-                html = re.sub(r'\n', '<br>\n', html)
-                return f'<div>{html}</div>'
-            restricted_globals['markdown_to_html'] = markdown_to_html
-        
-        restricted_globals['__builtins__'] = restricted_globals.get('__builtins__', {})
-        if isinstance(restricted_globals['__builtins__'], dict):
-            restricted_globals['__builtins__']['__import__'] = safe_import
-            restricted_globals['__builtins__']['_print_'] = PrintCollector
-            restricted_globals['__builtins__']['dict'] = dict
-            restricted_globals['__builtins__']['list'] = list
-            restricted_globals['__builtins__']['isinstance'] = isinstance
-        
-        # Capture stdout/stderr
-        import sys
-        from io import StringIO
-        old_stdout = sys.stdout
-        old_stderr = sys.stderr
-        stdout_capture = StringIO()
-        stderr_capture = StringIO()
-        sys.stdout = stdout_capture
-        sys.stderr = stderr_capture
+        collector = PrintCollector(getattr)
+        restricted_globals['_print_'] = lambda _getattr_=None: collector
         
         result = None
         try:
-            start_time = time.time()
-            exec(compiled_code, restricted_globals)
-            
-            # Try to get the result from the 'run' function
-            if 'run' in restricted_globals:
-                result = restricted_globals['run'](input_data)
-            else:
-                result = input_data
+            start_time = time.perf_counter()
+            if _PYTHON_ALARM:
+                signal.alarm(PYTHON_NODE_TIMEOUT)
+            try:
+                exec(compiled_code, restricted_globals)
                 
-            execution_time = time.time() - start_time
+                # Try to get the result from the 'run' function
+                if 'run' in restricted_globals:
+                    result = restricted_globals['run'](input_data)
+                else:
+                    result = input_data
+            finally:
+                if _PYTHON_ALARM:
+                    signal.alarm(0)
+                
+            execution_time = time.perf_counter() - start_time
             
             return {
                 'status': 'success',
                 'output': result,
-                'stdout': stdout_capture.getvalue(),
-                'stderr': stderr_capture.getvalue(),
+                'stdout': collector(),
+                'stderr': '',
                 'execution_time': execution_time
             }
             
+        except _PythonNodeTimeout:
+            return {
+                'status': 'error',
+                'error': f'Python node timed out after {PYTHON_NODE_TIMEOUT} seconds',
+                'output': None,
+                'stdout': collector(),
+                'stderr': ''
+            }
+        except MemoryError:
+            return {
+                'status': 'error',
+                'error': f'Python node ran out of memory (PYTHON_NODE_MEMORY_MB={PYTHON_NODE_MEMORY_MB})',
+                'output': None,
+                'stdout': collector(),
+                'stderr': ''
+            }
         except Exception as e:
             return {
                 'status': 'error',
                 'error': str(e),
                 'output': None,
-                'stdout': stdout_capture.getvalue(),
-                'stderr': stderr_capture.getvalue()
+                'stdout': collector(),
+                'stderr': ''
             }
-        finally:
-            sys.stdout = old_stdout
-            sys.stderr = old_stderr
             
     except Exception as e:
         return {
@@ -428,142 +589,798 @@ def execute_python_code(code: str, input_data: Any) -> Dict[str, Any]:
             'stderr': ''
         }
 
-def strip_typescript_types(ts_code: str) -> str:
-    """Simple TypeScript to JavaScript converter - strips type annotations"""
-    import re
-    
-    # Remove interface definitions - use bracket counting for proper nesting
-    def remove_interfaces(text):
-        result = []
-        i = 0
-        while i < len(text):
-            # Look for interface keyword
-            interface_match = re.match(r'interface\s+\w+\s*\{', text[i:])
-            if interface_match:
-                # Found interface start, now find matching closing brace
-                start_pos = i + interface_match.end() - 1  # Position of opening brace
-                brace_count = 1
-                current_pos = start_pos + 1
-                
-                while current_pos < len(text) and brace_count > 0:
-                    if text[current_pos] == '{':
-                        brace_count += 1
-                    elif text[current_pos] == '}':
-                        brace_count -= 1
-                    current_pos += 1
-                
-                if brace_count == 0:
-                    # Successfully found complete interface, skip it
-                    i = current_pos
-                    continue
-            
-            # Not an interface or incomplete interface, keep the character
-            result.append(text[i])
-            i += 1
-        
-        return ''.join(result)
-    
-    js_code = remove_interfaces(ts_code)
+# Python nodes run on a process pool so CPU-bound user code can't stall the event loop.
+# forkserver children start from a clean process instead of forking the threaded server.
+_PYTHON_MP_CONTEXT = multiprocessing.get_context(
+    'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else None
+)
+if _PYTHON_MP_CONTEXT.get_start_method() == 'forkserver':
+    # Import RestrictedPython and this module once in the fork server, so every worker starts
+    # with them loaded instead of importing them before its first node
+    _PYTHON_MP_CONTEXT.set_forkserver_preload(['RestrictedPython', 'RestrictedPython.PrintCollector', __name__])
+
+def get_python_executor() -> ProcessPoolExecutor:
+    """Return the app-wide Python executor, creating it on first use"""
+    executor = getattr(app.state, 'python_executor', None)
+    if executor is None:
+        executor = ProcessPoolExecutor(
+            max_workers=os.cpu_count(), mp_context=_PYTHON_MP_CONTEXT, initializer=_init_python_worker
+        )
+        app.state.python_executor = executor
+    return executor
+
+def _terminate_python_executor(executor: ProcessPoolExecutor):
+    """Kill a pool's workers, for runs that ignored SIGALRM (bare except, long C calls)"""
+    if getattr(app.state, 'python_executor', None) is executor:
+        app.state.python_executor = None
+    terminate_workers = getattr(executor, 'terminate_workers', None)
+    if terminate_workers is not None:
+        terminate_workers()
+        return
+    # Before Python 3.14 the pool has no public way to stop a busy worker
+    for process in list((getattr(executor, '_processes', None) or {}).values()):
+        process.terminate()
+    executor.shutdown(wait=False, cancel_futures=True)
+
+async def execute_python_code(code: str, input_data: Any) -> Dict[str, Any]:
+    """Execute Python code on the process pool without blocking the event loop"""
+    executor = get_python_executor()
+    try:
+        run = asyncio.get_running_loop().run_in_executor(
+            executor, _execute_python_code_sync, code, input_data
+        )
+        if PYTHON_NODE_TIMEOUT > 0:
+            return await asyncio.wait_for(run, PYTHON_NODE_TIMEOUT + PYTHON_NODE_TIMEOUT_GRACE)
+        return await run
+    except asyncio.TimeoutError:
+        # The worker's alarm didn't end the run, so the worker is stuck - replace the pool
+        _terminate_python_executor(executor)
+        error = f'Python node timed out after {PYTHON_NODE_TIMEOUT} seconds'
+    except BrokenProcessPool:
+        # A worker died mid-run - replace the pool so later nodes still execute
+        app.state.python_executor = None
+        executor.shutdown(wait=False)
+        error = 'Python worker process terminated unexpectedly'
+    except Exception as e:
+        # e.g. the node returned a value that can't be sent back from the worker
+        error = f'Execution failed: {str(e)}'
+    return {
+        'status': 'error',
+        'error': error,
+        'output': None,
+        'stdout': '',
+        'stderr': ''
+    }
+
+# Legacy regex stripping patterns, kept for comparison via TS_STRIPPER=regex
+_INTERFACE_RE = re.compile(r'interface\s+\w+\s*\{')
+_RETURN_TYPE_RE = re.compile(r'\)\s*:\s*[A-Za-z_$][\w<>]*(?=\s*\{)')
+_AS_CAST_RE = re.compile(r'\s+as\s+[A-Za-z_$][\w]*(?:<[^>]*>)?')
+_GENERIC_RE = re.compile(r':\s*[A-Za-z_$][\w]*<[^>]*>(?=\s*=)')
+_FUNC_DECL_RE = re.compile(r'function\s+\w+\s*\([^)]*\)')
+_ARROW_RE = re.compile(r'\w+\s*\([^)]*\)\s*=>')
+_PARAM_TYPE_RE = re.compile(r'(\w+)\s*:\s*[A-Za-z_$][\w<>\[\]]*(?=\s*[,)])')
+_MULTI_NL_RE = re.compile(r'\n\s*\n\s*\n')
+_LEAD_NL_RE = re.compile(r'^\s*\n')
+
+_BRACE_RE = re.compile(r'[{}]')
+
+def _remove_interfaces_regex(text: str) -> str:
+    """Drop complete interface blocks, brace-matching only from each interface header"""
+    parts = []
+    last_end = 0
+    for match in _INTERFACE_RE.finditer(text):
+        if match.start() < last_end:
+            # Header inside an interface that was already removed
+            continue
+        depth = 1
+        for brace in _BRACE_RE.finditer(text, match.end()):
+            depth += 1 if brace.group() == '{' else -1
+            if depth == 0:
+                parts.append(text[last_end:match.start()])
+                last_end = brace.end()
+                break
+        # An interface with no closing brace is left in place
+    parts.append(text[last_end:])
+    return ''.join(parts)
+
+def _strip_typescript_types_regex(ts_code: str) -> str:
+    """Legacy TypeScript to JavaScript converter built from regex rewrites"""
+    js_code = _remove_interfaces_regex(ts_code)
     
     # Remove function return type annotations after closing parenthesis
-    js_code = re.sub(r'\)\s*:\s*[A-Za-z_$][\w<>]*(?=\s*\{)', ')', js_code)
+    js_code = _RETURN_TYPE_RE.sub(')', js_code)
     
     # Remove type assertions like 'as Record<string, number>' completely
-    js_code = re.sub(r'\s+as\s+[A-Za-z_$][\w]*(?:<[^>]*>)?', '', js_code)
+    js_code = _AS_CAST_RE.sub('', js_code)
     
     # Remove generic types like Record<string, string> from variable declarations
-    js_code = re.sub(r':\s*[A-Za-z_$][\w]*<[^>]*>(?=\s*=)', '', js_code)
+    js_code = _GENERIC_RE.sub('', js_code)
     
     # Remove parameter type annotations ONLY within function parameter lists
     def remove_param_types(match):
-        func_signature = match.group(0)
         # Only remove type annotations within the parentheses
-        cleaned = re.sub(r'(\w+)\s*:\s*[A-Za-z_$][\w<>\[\]]*(?=\s*[,)])', r'\1', func_signature)
-        return cleaned
+        return _PARAM_TYPE_RE.sub(r'\1', match.group(0))
     
     # Match function signatures and clean their parameters
-    js_code = re.sub(r'function\s+\w+\s*\([^)]*\)', remove_param_types, js_code)
-    js_code = re.sub(r'\w+\s*\([^)]*\)\s*=>', remove_param_types, js_code)
+    js_code = _FUNC_DECL_RE.sub(remove_param_types, js_code)
+    js_code = _ARROW_RE.sub(remove_param_types, js_code)
     
     # Clean up multiple newlines and extra spaces
-    js_code = re.sub(r'\n\s*\n\s*\n', '\n\n', js_code)
-    js_code = re.sub(r'^\s*\n', '', js_code)
+    js_code = _MULTI_NL_RE.sub('\n\n', js_code)
+    js_code = _LEAD_NL_RE.sub('', js_code)
     
     return js_code.strip()
 
+# Single-pass TypeScript stripper: jumps between tokens of interest, tracking strings,
+# comments and regex literals so type syntax is only removed from real code
+_TS_TOKEN_RE = re.compile(r"""[A-Za-z_$\u0080-￿][\w$\u0080-￿]*|\d[\w.]*|//|/\*|['"`/(!]""")
+_TS_WORD_RE = re.compile(r'[A-Za-z_$\u0080-￿][\w$\u0080-￿]*')
+_TS_INTERFACE_HEAD_RE = re.compile(r'\s+[A-Za-z_$][\w$]*[\w$\s<>,.\[\]]*\{')
+_TS_QUALIFIED_NAME_RE = re.compile(r'[A-Za-z_$][\w$]*(?:\.[A-Za-z_$][\w$]*)*')
+_TS_TYPE_ALIAS_RE = re.compile(r'\s+[A-Za-z_$][\w$]*\s*(?:<[^=]*>)?\s*=')
+_TS_IMPLEMENTS_RE = re.compile(r'\s+implements\s+[^{]*')
+_TS_ACCESS_MODIFIER_RE = re.compile(r'\b(?:public|private|protected|readonly|declare|override)\s+')
+# Class member prefix: leading space, modifiers, name, optional '?' and an optional ': Type'
+_TS_CLASS_MEMBER_RE = re.compile(
+    r'(\s*)((?:(?:public|private|protected|readonly|declare|override|static|async)\s+)*)'
+    r'([A-Za-z_$#][\w$]*)\s*(\??!?)\s*(:)?'
+)
+_TS_REGEX_PRECEDERS = frozenset('(,=:[!&|?{};+-*%<>~^')
+_TS_REGEX_KEYWORDS = frozenset({
+    'return', 'typeof', 'case', 'do', 'else', 'in', 'of', 'new', 'delete',
+    'void', 'throw', 'instanceof', 'yield', 'await'
+})
+# Words whose following '(' starts an expression or condition, never a parameter list
+_TS_NON_PARAM_KEYWORDS = _TS_REGEX_KEYWORDS | {'if', 'for', 'while', 'switch', 'with', 'function'}
+_TS_EXPR_END = frozenset(')]}\'"`')
+_TS_OPEN = frozenset('([{<')
+_TS_CLOSE = frozenset(')]}>')
+
+def _is_ident_char(c: str) -> bool:
+    return c.isalnum() or c in '_$'
+
+def _skip_ws(src: str, i: int, end: int) -> int:
+    """Skip whitespace and comments"""
+    while i < end:
+        c = src[i]
+        if c.isspace():
+            i += 1
+        elif src.startswith('//', i):
+            j = src.find('\n', i, end)
+            i = end if j < 0 else j
+        elif src.startswith('/*', i):
+            j = src.find('*/', i + 2, end)
+            i = end if j < 0 else j + 2
+        else:
+            break
+    return i
+
+def _skip_string(src: str, i: int, end: int) -> int:
+    """Return the index just past the string or template literal starting at i"""
+    quote = src[i]
+    i += 1
+    while i < end:
+        c = src[i]
+        if c == '\\':
+            i += 2
+        elif c == quote:
+            return i + 1
+        elif quote == '`' and c == '$' and src.startswith('${', i):
+            i = _skip_balanced(src, i + 1, end)
+        elif c == '\n' and quote != '`':
+            return i
+        else:
+            i += 1
+    return end
+
+def _skip_regex(src: str, i: int, end: int) -> int:
+    """Return the index just past the regex literal starting at i"""
+    in_class = False
+    j = i + 1
+    while j < end:
+        c = src[j]
+        if c == '\\':
+            j += 2
+            continue
+        if c == '\n':
+            return i + 1  # Not a regex after all - treat '/' as an operator
+        if c == '[':
+            in_class = True
+        elif c == ']':
+            in_class = False
+        elif c == '/' and not in_class:
+            j += 1
+            while j < end and _is_ident_char(src[j]):
+                j += 1
+            return j
+        j += 1
+    return i + 1
+
+def _regex_allowed(prev_sig: str, prev_word: str) -> bool:
+    return not prev_sig or prev_sig in _TS_REGEX_PRECEDERS or prev_word in _TS_REGEX_KEYWORDS
+
+def _skip_balanced(src: str, i: int, end: int) -> int:
+    """Return the index just past the bracket matching the one at i"""
+    depth = 0
+    prev_sig = ''
+    prev_word = ''
+    while i < end:
+        c = src[i]
+        if c in '\'"`':
+            i = _skip_string(src, i, end)
+            prev_sig, prev_word = c, ''
+            continue
+        if c == '/':
+            if src.startswith('//', i) or src.startswith('/*', i):
+                i = _skip_ws(src, i, end)
+                continue
+            if _regex_allowed(prev_sig, prev_word):
+                i = _skip_regex(src, i, end)
+                prev_sig, prev_word = 'a', ''
+                continue
+        if c in '([{':
+            depth += 1
+        elif c in ')]}':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        if _is_ident_char(c):
+            match = _TS_WORD_RE.match(src, i)
+            if match:
+                prev_word = match.group(0)
+                prev_sig = prev_word[-1]
+                i = match.end()
+                continue
+            prev_sig, prev_word = c, ''
+        elif not c.isspace():
+            prev_sig, prev_word = c, ''
+        i += 1
+    return end
+
+def _skip_angles(src: str, i: int, end: int) -> int:
+    """Return the index just past the '>' closing the generic parameters at i"""
+    depth = 0
+    while i < end:
+        c = src[i]
+        if c == '<':
+            depth += 1
+        elif c == '>' and src[i - 1] != '=':
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    return end
+
+def _skip_type(src: str, i: int, end: int, context: str) -> int:
+    """Return where the type expression starting at i ends (trailing spaces excluded)
+
+    context is 'annotation' (params and declarations), 'return' (function return
+    types, ended by '=>' or the body's '{') or 'cast' (the type after 'as').
+    """
+    j = i
+    while j < end and src[j] in ' \t\r\n':
+        j += 1
+    depth = 0
+    started = False
+    last = ''
+    while j < end:
+        c = src[j]
+        if c in '\'"`':
+            j = _skip_string(src, j, end)
+            started, last = True, c
+            continue
+        if src.startswith('=>', j):
+            if depth > 0 or (context != 'return' and last == ')'):
+                j += 2
+                last = '>'
+                continue
+            break
+        if depth == 0:
+            if c in ',;)]}=>':
+                break
+            if c == '{' and started and (_is_ident_char(last) or last in _TS_EXPR_END or last == '>'):
+                break
+            if c == '\n' and started and last not in '|&,<(:':
+                k = _skip_ws(src, j, end)
+                if k >= end or src[k] not in '|&.':
+                    break
+            if c in '?+*/%!^~:' or (c == '-' and started):
+                break
+            if c in '&|' and src.startswith(c * 2, j):
+                break
+        if c in _TS_OPEN:
+            depth += 1
+        elif c in _TS_CLOSE:
+            depth -= 1
+        if not c.isspace():
+            started, last = True, c
+        j += 1
+    while j > i and src[j - 1] in ' \t':
+        j -= 1
+    return j
+
+def _strip_params(src: str, start: int, end: int) -> str:
+    """Remove type annotations from the parameter list between start and end"""
+    parts = []
+    p = start
+    while p <= end:
+        # Find the end of this parameter and its first top-level ':' or '='
+        q = p
+        marker = -1
+        angles = 0
+        while q < end:
+            c = src[q]
+            if c in '\'"`':
+                q = _skip_string(src, q, end)
+                continue
+            if c in '([{':
+                q = _skip_balanced(src, q, end)
+                continue
+            if c == ',' and angles == 0:
+                break
+            if marker < 0 and (c == ':' or (c == '=' and not src.startswith('=>', q))):
+                marker = q
+            elif marker >= 0 and src[marker] == ':':
+                # Commas inside generic types like Record<K, V> don't end the parameter
+                if c == '<':
+                    angles += 1
+                elif c == '>' and src[q - 1] != '=' and angles:
+                    angles -= 1
+            q += 1
+        if marker >= 0 and src[marker] == ':':
+            name_end = marker
+            while name_end > p and src[name_end - 1] in ' \t':
+                name_end -= 1
+            if name_end > p and src[name_end - 1] == '?':
+                name_end -= 1
+            type_end = _skip_type(src, marker + 1, q, 'annotation')
+            name = _TS_ACCESS_MODIFIER_RE.sub('', _strip_range(src, p, name_end))
+            parts.append(name + _strip_range(src, type_end, q))
+        else:
+            parts.append(_TS_ACCESS_MODIFIER_RE.sub('', _strip_range(src, p, q)))
+        p = q + 1
+    return ','.join(parts)
+
+def _strip_class_header(header: str) -> str:
+    """Drop generic parameters and the implements clause from 'class Name<T> extends Base<T> implements I'"""
+    header = _TS_IMPLEMENTS_RE.sub('', header)
+    parts = []
+    i = 0
+    while True:
+        k = header.find('<', i)
+        if k < 0:
+            break
+        parts.append(header[i:k])
+        i = _skip_angles(header, k, len(header))
+    parts.append(header[i:])
+    return ''.join(parts)
+
+def _strip_class_body(src: str, start: int, end: int) -> str:
+    """Strip field annotations and access modifiers from each member of a class body"""
+    out = []
+    p = start
+    while p < end:
+        # A member ends at a top-level ';' or after a method body's closing '}'
+        q = p
+        while q < end:
+            c = src[q]
+            if c in '\'"`':
+                q = _skip_string(src, q, end)
+            elif c == '/' and (src.startswith('//', q) or src.startswith('/*', q)):
+                q = _skip_ws(src, q, end)
+            elif c == '{':
+                q = _skip_balanced(src, q, end)
+                if _skip_ws(src, q, end) >= end or src[_skip_ws(src, q, end)] != ';':
+                    break
+            elif c in '([':
+                q = _skip_balanced(src, q, end)
+            elif c == ';':
+                q += 1
+                break
+            else:
+                q += 1
+        field = _TS_CLASS_MEMBER_RE.match(src, p, q)
+        if field:
+            out.append(field.group(1) + _TS_ACCESS_MODIFIER_RE.sub('', field.group(2)) + field.group(3))
+            member_start = field.end(3)
+            if field.group(5):
+                member_start = _skip_type(src, field.end(), q, 'annotation')
+            out.append(_strip_range(src, member_start, q))
+        else:
+            out.append(_strip_range(src, p, q))
+        p = q
+    return ''.join(out)
+
+def _strip_range(src: str, start: int, end: int) -> str:
+    """Strip TypeScript-only syntax from src[start:end]"""
+    out = []
+    emit_from = start
+    prev_sig = ''
+    prev_word = ''
+    after_function = False
+    i = start
+    while i < end:
+        match = _TS_TOKEN_RE.search(src, i, end)
+        if match is None:
+            break
+        raw_gap = src[i:match.start()]
+        gap = raw_gap.rstrip()
+        if gap:
+            prev_sig, prev_word = gap[-1], ''
+            after_function = False
+        statement_start = not prev_sig or prev_sig in ';{}' or '\n' in raw_gap
+        i = match.start()
+        token = match.group(0)
+        c = token[0]
+
+        if token == '//' or token == '/*':
+            i = _skip_ws(src, i, end)
+            continue
+
+        if c == '`':
+            # Template literal - strip types inside ${...} expressions, keep the text as is
+            j = i + 1
+            while j < end:
+                ch = src[j]
+                if ch == '\\':
+                    j += 2
+                elif ch == '`':
+                    j += 1
+                    break
+                elif src.startswith('${', j):
+                    close = _skip_balanced(src, j + 1, end)
+                    out.append(src[emit_from:j + 2])
+                    out.append(_strip_range(src, j + 2, close - 1))
+                    emit_from = j = close - 1
+                else:
+                    j += 1
+            i = j
+            prev_sig, prev_word = c, ''
+            after_function = False
+            continue
+
+        if c in '\'"':
+            i = _skip_string(src, i, end)
+            prev_sig, prev_word = c, ''
+            after_function = False
+            continue
+
+        if c == '/':
+            if _regex_allowed(prev_sig, prev_word):
+                i = _skip_regex(src, i, end)
+                prev_sig, prev_word = 'a', ''
+            else:
+                i += 1
+                prev_sig, prev_word = '/', ''
+            continue
+
+        if c == '!':
+            # Non-null assertion like value!.field - drop the '!'
+            if i > start and (_is_ident_char(src[i - 1]) or src[i - 1] in ')]') and not src.startswith('!=', i):
+                out.append(src[emit_from:i])
+                emit_from = i + 1
+            else:
+                prev_sig, prev_word = '!', ''
+            i += 1
+            continue
+
+        if c == '(':
+            close = _skip_balanced(src, i, end)
+            k = _skip_ws(src, close, end)
+            is_params = after_function or src.startswith('=>', k)
+            return_end = -1
+            if not is_params and k < end and src[k] == ':':
+                return_end = _skip_type(src, k + 1, end, 'return')
+                k2 = _skip_ws(src, return_end, end)
+                if src.startswith('=>', k2):
+                    is_params = True
+                elif (k2 < end and src[k2] == '{' and (_is_ident_char(prev_sig) or prev_sig == ']')
+                        and prev_word not in _TS_NON_PARAM_KEYWORDS):
+                    is_params = True  # Method with a return type: name(args): Type {
+                else:
+                    return_end = -1
+            elif after_function and k < end and src[k] == ':':
+                return_end = _skip_type(src, k + 1, end, 'return')
+            elif (not is_params and k < end and src[k] == '{' and '\n' not in src[close:k]
+                    and (_is_ident_char(prev_sig) or prev_sig == ']') and prev_word not in _TS_NON_PARAM_KEYWORDS):
+                is_params = True  # Method or catch clause: name(args) {
+            after_function = False
+
+            if not is_params:
+                prev_sig, prev_word = '(', ''
+                i += 1
+                continue
+
+            out.append(src[emit_from:i + 1])
+            out.append(_strip_params(src, i + 1, close - 1))
+            out.append(')')
+            emit_from = return_end if return_end >= 0 else close
+            i = emit_from
+            prev_sig, prev_word = ')', ''
+            continue
+
+        # Identifier, keyword or number
+        i = match.end()
+        if prev_sig == '.' or c.isdigit():
+            prev_sig, prev_word = token[-1], token
+            after_function = False
+            continue
+
+        if token == 'interface':
+            head = _TS_INTERFACE_HEAD_RE.match(src, i, end)
+            if head:
+                body_end = _skip_balanced(src, head.end() - 1, end)
+                out.append(src[emit_from:match.start()])
+                emit_from = i = body_end
+                prev_sig, prev_word = '}', ''
+                continue
+
+        elif token == 'type' and statement_start:
+            alias = _TS_TYPE_ALIAS_RE.match(src, i, end)
+            if alias:
+                type_end = _skip_type(src, alias.end(), end, 'annotation')
+                if type_end < end and src[type_end] == ';':
+                    type_end += 1
+                out.append(src[emit_from:match.start()])
+                emit_from = i = type_end
+                prev_sig, prev_word = ';', ''
+                continue
+
+        elif token == 'class':
+            brace = src.find('{', i, end)
+            if brace >= 0:
+                body_end = _skip_balanced(src, brace, end)
+                out.append(src[emit_from:i])
+                out.append(_strip_class_header(src[i:brace]))
+                out.append('{')
+                out.append(_strip_class_body(src, brace + 1, body_end - 1))
+                out.append('}')
+                emit_from = i = body_end
+                prev_sig, prev_word = '}', ''
+                continue
+
+        elif token in ('const', 'let', 'var'):
+            k = _skip_ws(src, i, end)
+            if k < end and src[k] in '{[':
+                k = _skip_balanced(src, k, end)
+            else:
+                word = _TS_WORD_RE.match(src, k, end)
+                k = word.end() if word else k
+            colon = _skip_ws(src, k, end)
+            if colon < end and src[colon] == '!':
+                colon = _skip_ws(src, colon + 1, end)
+            if colon < end and src[colon] == ':':
+                type_end = _skip_type(src, colon + 1, end, 'annotation')
+                out.append(src[emit_from:k])
+                emit_from = i = type_end
+                prev_sig, prev_word = 'a', ''
+                continue
+
+        elif token == 'as' and (_is_ident_char(prev_sig) or prev_sig in _TS_EXPR_END) and prev_word not in _TS_REGEX_KEYWORDS:
+            k = _skip_ws(src, i, end)
+            if k < end and (_is_ident_char(src[k]) or src[k] in '{[('):
+                cut = match.start()
+                while cut > emit_from and src[cut - 1] in ' \t':
+                    cut -= 1
+                type_end = _skip_type(src, k, end, 'cast')
+                out.append(src[emit_from:cut])
+                emit_from = i = type_end
+                prev_sig, prev_word = 'a', ''
+                continue
+
+        elif token == 'new':
+            # new Map<string, number>() - drop the type arguments
+            k = _skip_ws(src, i, end)
+            name = _TS_QUALIFIED_NAME_RE.match(src, k, end)
+            if name and src.startswith('<', name.end()):
+                type_args_end = _skip_angles(src, name.end(), end)
+                if src.startswith('(', type_args_end):
+                    out.append(src[emit_from:name.end()])
+                    emit_from = i = type_args_end
+                    prev_sig, prev_word = 'a', ''
+                    continue
+
+        elif token == 'function':
+            # function name<T>(...) - drop generic parameters before the argument list
+            k = _skip_ws(src, i, end)
+            if src.startswith('*', k):
+                k = _skip_ws(src, k + 1, end)
+            word = _TS_WORD_RE.match(src, k, end)
+            if word:
+                k = _skip_ws(src, word.end(), end)
+            if src.startswith('<', k):
+                generic_end = _skip_angles(src, k, end)
+                out.append(src[emit_from:k])
+                emit_from = generic_end
+                k = generic_end
+            i = k
+            prev_sig, prev_word = 'n', 'function'
+            after_function = True
+            continue
+
+        prev_sig, prev_word = token[-1], token
+        after_function = False
+
+    out.append(src[emit_from:end])
+    return ''.join(out)
+
+# Set TS_STRIPPER=regex to fall back to the legacy stripper when comparing output, or
+# TS_STRIPPER=node to have the Node worker transpile with esbuild or the typescript package
+TS_STRIPPER = os.getenv('TS_STRIPPER', 'tokenizer').lower()
+
+@functools.lru_cache(maxsize=256)
+def strip_typescript_types(ts_code: str) -> str:
+    """Simple TypeScript to JavaScript converter - strips type annotations"""
+    if TS_STRIPPER == 'regex':
+        return _strip_typescript_types_regex(ts_code)
+    return _strip_range(ts_code, 0, len(ts_code)).strip()
+
+# Persistent Node.js worker that executes TypeScript nodes (see worker.js)
+NODE_WORKER_SCRIPT = Path(__file__).parent / 'worker.js'
+# Absolute path plus close_fds=False lets subprocess use posix_spawn instead of fork+exec
+NODE_BINARY = shutil.which('node') or 'node'
+NODE_WORKER_FRAME_HEADER = struct.Struct('<I')  # 4-byte little-endian frame length
+
+class NodeWorker:
+    """Long-lived Node.js process running jobs over length-prefixed JSON frames on stdin/stdout"""
+    
+    def __init__(self):
+        self.process: Optional[asyncio.subprocess.Process] = None
+        self.reader_task: Optional[asyncio.Task] = None
+        self.pending: Dict[str, asyncio.Future] = {}
+        self.start_lock = asyncio.Lock()
+    
+    @property
+    def running(self) -> bool:
+        return self.process is not None and self.process.returncode is None
+    
+    async def start(self):
+        """Spawn the Node process and the background reader that resolves job futures"""
+        self.process = await asyncio.create_subprocess_exec(
+            NODE_BINARY, str(NODE_WORKER_SCRIPT),
+            stdin=asyncio.subprocess.PIPE,
+            stdout=asyncio.subprocess.PIPE,
+            close_fds=False  # Our descriptors are non-inheritable by default, so nothing leaks
+        )
+        self.reader_task = asyncio.create_task(self._read_results(self.process))
+    
+    async def stop(self):
+        """Kill the Node process and fail any jobs still waiting on it"""
+        if self.running:
+            self.process.kill()
+            await self.process.wait()
+        if self.reader_task is not None:
+            self.reader_task.cancel()
+            self.reader_task = None
+        self._fail_pending('Node worker stopped')
+        self.process = None
+    
+    async def _read_results(self, process: asyncio.subprocess.Process):
+        """Dispatch each result frame to the future waiting on its job id"""
+        while True:
+            try:
+                header = await process.stdout.readexactly(NODE_WORKER_FRAME_HEADER.size)
+                (length,) = NODE_WORKER_FRAME_HEADER.unpack(header)
+                body = await process.stdout.readexactly(length)
+            except asyncio.IncompleteReadError:
+                break
+            try:
+                message = _json_loads(body)
+            except ValueError:
+                continue
+            future = self.pending.pop(message.get('id'), None)
+            if future is not None and not future.done():
+                future.set_result(message)
+        self._fail_pending('Node worker exited unexpectedly')
+    
+    def _fail_pending(self, reason: str):
+        for future in self.pending.values():
+            if not future.done():
+                future.set_exception(RuntimeError(reason))
+        self.pending.clear()
+    
+    async def run(self, code: str, input_data: Any, timeout: float = 5.0, typescript: bool = False) -> Dict[str, Any]:
+        """Send one job to the worker and wait for its result; typescript jobs are transpiled there"""
+        if not self.running:
+            async with self.start_lock:
+                if not self.running:
+                    await self.start()
+        
+        job_id = uuid.uuid4().hex
+        future = asyncio.get_running_loop().create_future()
+        self.pending[job_id] = future
+        
+        job = {'id': job_id, 'code': code, 'input': input_data}
+        if typescript:
+            job['typescript'] = True
+        job = _json_dumps(job)
+        self.process.stdin.write(NODE_WORKER_FRAME_HEADER.pack(len(job)) + job)
+        await self.process.stdin.drain()
+        
+        try:
+            return await asyncio.wait_for(future, timeout=timeout)
+        except asyncio.TimeoutError:
+            # The job may be stuck in a loop, so restart the worker rather than reuse it
+            self.pending.pop(job_id, None)
+            await self.stop()
+            raise
+
+class NodeWorkerPool:
+    """Fixed-size pool of Node workers handed out through an asyncio.Queue"""
+    
+    def __init__(self, size: int):
+        self.workers = [NodeWorker() for _ in range(size)]
+        self.idle: asyncio.Queue = asyncio.Queue()
+        for worker in self.workers:
+            self.idle.put_nowait(worker)
+    
+    async def start(self):
+        await asyncio.gather(*(worker.start() for worker in self.workers))
+    
+    async def stop(self):
+        await asyncio.gather(*(worker.stop() for worker in self.workers))
+    
+    @asynccontextmanager
+    async def acquire(self):
+        """Borrow an idle worker for the duration of one job"""
+        worker = await self.idle.get()
+        try:
+            yield worker
+        finally:
+            self.idle.put_nowait(worker)
+
+NODE_WORKER_POOL_SIZE = int(os.getenv('NODE_WORKER_POOL_SIZE', os.cpu_count() or 1))
+
+def get_node_pool() -> NodeWorkerPool:
+    """Return the app-wide Node worker pool, creating it if startup hasn't run"""
+    pool = getattr(app.state, 'node_pool', None)
+    if pool is None:
+        pool = NodeWorkerPool(NODE_WORKER_POOL_SIZE)
+        app.state.node_pool = pool
+    return pool
+
 async def execute_typescript_code(code: str, input_data: Any) -> Dict[str, Any]:
     """Execute TypeScript code using Node.js (converts TS to JS first)"""
     try:
-        # Convert TypeScript to JavaScript
-        js_code = strip_typescript_types(code)
-        
-        with tempfile.NamedTemporaryFile(mode='w', suffix='.js', delete=False) as f:
-            wrapped_code = f"""
-{js_code}
-
-const input = {json.dumps(input_data)};
-
-(async () => {{
-    try {{
-        const result = await run(input);
-        console.log(JSON.stringify({{ success: true, result }}));
-    }} catch (error) {{
-        console.error(JSON.stringify({{ success: false, error: error.message }}));
-    }}
-}})();
-"""
-            f.write(wrapped_code)
-            temp_path = f.name
+        # Convert TypeScript to JavaScript here, unless the worker is doing it
+        transpile_in_worker = TS_STRIPPER == 'node'
+        js_code = code if transpile_in_worker else strip_typescript_types(code)
         
-        try:
-            start_time = time.time()
-            process = await asyncio.create_subprocess_exec(
-                'node', temp_path,
-                stdout=asyncio.subprocess.PIPE,
-                stderr=asyncio.subprocess.PIPE
-            )
-            
-            stdout, stderr = await asyncio.wait_for(
-                process.communicate(), timeout=5.0
-            )
-            
-            execution_time = time.time() - start_time
-            stdout_str = stdout.decode('utf-8')
-            stderr_str = stderr.decode('utf-8')
-            
-            if stdout_str.strip():
-                result_data = json.loads(stdout_str.strip().split('\n')[-1])
-                if result_data.get('success'):
-                    return {
-                        'status': 'success',
-                        'output': result_data['result'],
-                        'stdout': stdout_str,
-                        'stderr': stderr_str,
-                        'execution_time': execution_time
-                    }
-                else:
-                    return {
-                        'status': 'error',
-                        'error': result_data.get('error', 'Unknown error'),
-                        'output': None,
-                        'stdout': stdout_str,
-                        'stderr': stderr_str
-                    }
-            else:
-                return {
-                    'status': 'error',
-                    'error': 'No output from TypeScript execution',
-                    'output': None,
-                    'stdout': stdout_str,
-                    'stderr': stderr_str
-                }
-                
-        finally:
-            try:
-                os.unlink(temp_path)
-            except:
-                pass
-                
+        # Execute on an idle worker from the persistent Node.js pool
+        start_time = time.perf_counter()
+        async with get_node_pool().acquire() as worker:
+            result_data = await worker.run(js_code, input_data, timeout=5.0, typescript=transpile_in_worker)
+        execution_time = time.perf_counter() - start_time
+        
+        stdout_str = result_data.get('stdout', '')
+        stderr_str = result_data.get('stderr', '')
+        
+        if result_data.get('success'):
+            return {
+                'status': 'success',
+                'output': result_data.get('result'),
+                'stdout': stdout_str,
+                'stderr': stderr_str,
+                'execution_time': execution_time
+            }
+        else:
+            return {
+                'status': 'error',
+                'error': result_data.get('error', 'Unknown error'),
+                'output': None,
+                'stdout': stdout_str,
+                'stderr': stderr_str
+            }
+    
+    except asyncio.TimeoutError:
+        return {
+            'status': 'error',
+            'error': 'Execution timeout (5 seconds)',
+            'output': None,
+            'stdout': '',
+            'stderr': ''
+        }
     except Exception as e:
         return {
             'status': 'error',
@@ -573,6 +1390,57 @@ const input = {json.dumps(input_data)};
             'stderr': ''
         }
 
+@functools.lru_cache(maxsize=256)
+def _placeholder_pattern(keys: frozenset) -> re.Pattern:
+    """Compile one alternation regex matching {key} for every key of an input dict"""
+    return re.compile(r'\{(' + '|'.join(re.escape(key) for key in keys) + r')\}')
+
+def _render(template: str, data: Any, fmt: Callable[[Any], str] = str) -> str:
+    """Fill {key} placeholders in a template from a dict in a single regex pass"""
+    # Most strings have no placeholders at all - skip the key set and regex entirely
+    if '{' not in template or not isinstance(data, dict) or not data:
+        return template
+    keys = frozenset(key for key in data if isinstance(key, str))
+    if not keys:
+        return template
+    return _placeholder_pattern(keys).sub(lambda match: fmt(data[match.group(1)]), template)
+
+def _render_obj(obj: Any, data: Any) -> Any:
+    """Apply _render to every string inside nested dicts and lists"""
+    if isinstance(obj, str):
+        return _render(obj, data)
+    elif isinstance(obj, dict):
+        return {k: _render_obj(v, data) for k, v in obj.items()}
+    elif isinstance(obj, list):
+        return [_render_obj(item, data) for item in obj]
+    return obj
+
+# Upper bound on HTTP node response bodies held in memory
+HTTP_MAX_RESPONSE_BYTES = int(os.getenv('HTTP_MAX_RESPONSE_BYTES', 50 * 1024 * 1024))
+
+async def _read_http_body(response: aiohttp.ClientResponse) -> bytes:
+    """Read a response body once, refusing bodies over HTTP_MAX_RESPONSE_BYTES"""
+    body = bytearray()
+    async for chunk in response.content.iter_chunked(64 * 1024):
+        body += chunk
+        if len(body) > HTTP_MAX_RESPONSE_BYTES:
+            raise ValueError(f'Response body exceeds {HTTP_MAX_RESPONSE_BYTES} bytes')
+    return bytes(body)
+
+# Marks a response body that was not parsed as JSON (None is a valid JSON value)
+_NOT_JSON = object()
+
+# Bytes a JSON document can start with, including top-level scalars like 42, true or "ok"
+_JSON_FIRST_BYTES = b'{["-0123456789tfn'
+
+def _looks_like_json(content_type: str, body: bytes) -> bool:
+    """Whether a response body is worth handing to the JSON parser"""
+    if 'json' in content_type:
+        return True
+    # Servers often mislabel JSON as text/plain; skip the parse for HTML and other text
+    first = body.lstrip(b' \t\r\n\xef\xbb\xbf')[:1]
+    return bool(first) and first in _JSON_FIRST_BYTES
+
 async def execute_http_request(config: Dict[str, Any], input_data: Any) -> Dict[str, Any]:
     """Execute HTTP/API request"""
     try:
@@ -584,69 +1452,62 @@ async def execute_http_request(config: Dict[str, Any], input_data: Any) -> Dict[
         timeout = config.get('timeout', 30)
         
         # Replace placeholders in URL, headers, params, and body with input data
-        def replace_placeholders(obj, data):
-            if isinstance(obj, str):
-                try:
-                    # Simple template replacement using input data
-                    import re
-                    for key, value in (data.items() if isinstance(data, dict) else {}):
-                        obj = obj.replace(f'{{{key}}}', str(value))
-                    return obj
-                except:
-                    return obj
-            elif isinstance(obj, dict):
-                return {k: replace_placeholders(v, data) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [replace_placeholders(item, data) for item in obj]
-            return obj
-        
-        processed_url = replace_placeholders(url, input_data)
-        processed_headers = replace_placeholders(headers, input_data)
-        processed_params = replace_placeholders(params, input_data)
-        processed_body = replace_placeholders(body, input_data)
-        
-        start_time = time.time()
-        
-        async with aiohttp.ClientSession() as session:
-            async with session.request(
-                method,
-                processed_url,
-                headers=processed_headers,
-                params=processed_params,
-                json=processed_body if method in ['POST', 'PUT', 'PATCH'] else None,
-                timeout=aiohttp.ClientTimeout(total=timeout)
-            ) as response:
-                response_text = await response.text()
-                
+        if isinstance(input_data, dict) and input_data:
+            processed_url = _render_obj(url, input_data)
+            processed_headers = _render_obj(headers, input_data)
+            processed_params = _render_obj(params, input_data)
+            processed_body = _render_obj(body, input_data)
+        else:
+            # Only dict input can fill placeholders - skip rebuilding the request structures
+            processed_url, processed_headers, processed_params, processed_body = url, headers, params, body
+        
+        start_time = time.perf_counter()
+        
+        session = get_http_session()
+        async with session.request(
+            method,
+            processed_url,
+            headers=processed_headers,
+            params=processed_params,
+            json=processed_body if method in ['POST', 'PUT', 'PATCH'] else None,
+            timeout=aiohttp.ClientTimeout(total=timeout)
+        ) as response:
+            body = await _read_http_body(response)
+            
+            # Parse the raw bytes directly - only decode to text when it isn't JSON
+            response_data = _NOT_JSON
+            if _looks_like_json(response.content_type, body):
                 try:
-                    response_data = json.loads(response_text)
-                except json.JSONDecodeError:
-                    response_data = response_text
-                
-                execution_time = time.time() - start_time
-                
-                # Merge original input data with response so downstream nodes can access both
-                output_data = {
-                    'status_code': response.status,
-                    'headers': dict(response.headers),
-                    'data': response_data,
-                    'url': str(response.url),
-                    'method': method
-                }
-                
-                # Preserve original input data (like 'ticker') for downstream nodes
-                if isinstance(input_data, dict):
-                    for key, value in input_data.items():
-                        if key not in output_data:  # Don't overwrite response fields
-                            output_data[key] = value
-                
-                return {
-                    'status': 'success',
-                    'output': output_data,
-                    'stdout': f"HTTP {method} {processed_url} -> {response.status}",
-                    'stderr': '',
-                    'execution_time': execution_time
-                }
+                    response_data = _json_loads(body.removeprefix(codecs.BOM_UTF8))
+                except ValueError:
+                    pass
+            if response_data is _NOT_JSON:
+                response_data = body.decode(response.charset or 'utf-8', errors='replace')
+            
+            execution_time = time.perf_counter() - start_time
+            
+            # Merge original input data with response so downstream nodes can access both
+            output_data = {
+                'status_code': response.status,
+                'headers': dict(response.headers),
+                'data': response_data,
+                'url': str(response.url),
+                'method': method
+            }
+            
+            # Preserve original input data (like 'ticker') for downstream nodes
+            if isinstance(input_data, dict):
+                for key, value in input_data.items():
+                    if key not in output_data:  # Don't overwrite response fields
+                        output_data[key] = value
+            
+            return {
+                'status': 'success',
+                'output': output_data,
+                'stdout': f"HTTP {method} {processed_url} -> {response.status}",
+                'stderr': '',
+                'execution_time': execution_time
+            }
                 
     except Exception as e:
         return {
@@ -657,6 +1518,38 @@ async def execute_http_request(config: Dict[str, Any], input_data: Any) -> Dict[
             'stderr': str(e)
         }
 
+# Files below this size are read in a single to_thread call instead of through aiofiles
+SMALL_FILE_BYTES = 64 * 1024
+
+# Largest file a read operation will load into a node's output
+FILE_MAX_READ_BYTES = int(os.getenv('FILE_MAX_READ_BYTES', 50 * 1024 * 1024))
+FILE_READ_CHUNK_BYTES = 64 * 1024
+
+def _decode_text(data: bytes, encoding: str) -> str:
+    """Decode file bytes with the same newline translation as a text-mode read"""
+    text = data.decode(encoding)
+    if '\r' in text:
+        text = text.replace('\r\n', '\n').replace('\r', '\n')
+    return text
+
+def _append_bytes(path: str, data: bytes) -> None:
+    """Append already-encoded content to a file"""
+    with open(path, 'ab') as f:
+        f.write(data)
+
+def _list_dir(dir_path: Path) -> List[str]:
+    """Entry paths of a directory - scandir yields them straight from the directory read, no Path per entry"""
+    with os.scandir(dir_path) as entries:
+        return [entry.path for entry in entries]
+
+def _workflow_file_path(file_path: str) -> str:
+    """Map a file node path into /tmp/workflow_files"""
+    safe_base = Path('/tmp/workflow_files')
+    safe_base.mkdir(exist_ok=True)
+    if not file_path.startswith('/tmp/workflow_files/'):
+        file_path = str(safe_base / Path(file_path).name)
+    return file_path
+
 async def execute_file_operation(config: Dict[str, Any], input_data: Any) -> Dict[str, Any]:
     """Execute file operation"""
     try:
@@ -666,71 +1559,76 @@ async def execute_file_operation(config: Dict[str, Any], input_data: Any) -> Dic
         encoding = config.get('encoding', 'utf-8')
         
         # Security check - restrict to safe paths
-        safe_base = Path('/tmp/workflow_files')
-        safe_base.mkdir(exist_ok=True)
-        
-        if not file_path.startswith('/tmp/workflow_files/'):
-            file_path = str(safe_base / Path(file_path).name)
+        file_path = _workflow_file_path(file_path)
         
         file_path_obj = Path(file_path)
-        start_time = time.time()
+        start_time = time.perf_counter()
         result_data = {}
         
         if operation == 'read':
-            if not file_path_obj.exists():
+            try:
+                size = file_path_obj.stat().st_size
+            except FileNotFoundError:
                 raise FileNotFoundError(f"File not found: {file_path}")
             
-            async with aiofiles.open(file_path, 'r', encoding=encoding) as f:
-                content_data = await f.read()
-                result_data = {
-                    'content': content_data,
-                    'path': file_path,
-                    'size': file_path_obj.stat().st_size,
-                    'operation': 'read'
-                }
+            if size > FILE_MAX_READ_BYTES:
+                raise ValueError(f"File is {size} bytes, over the {FILE_MAX_READ_BYTES} byte read limit: {file_path}")
+            if size < SMALL_FILE_BYTES:
+                # One thread hop for the whole read beats aiofiles' per-call hops on small files
+                content_data = await asyncio.to_thread(file_path_obj.read_text, encoding=encoding)
+            else:
+                # Read raw chunks and decode once instead of through the text-mode wrapper
+                data = bytearray()
+                async with aiofiles.open(file_path, 'rb') as f:
+                    while chunk := await f.read(FILE_READ_CHUNK_BYTES):
+                        data += chunk
+                content_data = _decode_text(data, encoding)
+            result_data = {
+                'content': content_data,
+                'path': file_path,
+                'size': size,
+                'operation': 'read'
+            }
                 
         elif operation == 'write':
             # Replace content placeholders with input data
-            if isinstance(input_data, dict):
-                for key, value in input_data.items():
-                    content = content.replace(f'{{{key}}}', str(value))
-            
-            async with aiofiles.open(file_path, 'w', encoding=encoding) as f:
-                await f.write(content)
-                result_data = {
-                    'path': file_path,
-                    'bytes_written': len(content.encode(encoding)),
-                    'operation': 'write'
-                }
+            content = _render(content, input_data)
+            data = content.encode(encoding)
+            
+            await asyncio.to_thread(file_path_obj.write_bytes, data)
+            result_data = {
+                'path': file_path,
+                'bytes_written': len(data),
+                'operation': 'write'
+            }
                 
         elif operation == 'append':
             # Replace content placeholders with input data
-            if isinstance(input_data, dict):
-                for key, value in input_data.items():
-                    content = content.replace(f'{{{key}}}', str(value))
-            
-            async with aiofiles.open(file_path, 'a', encoding=encoding) as f:
-                await f.write(content)
-                result_data = {
-                    'path': file_path,
-                    'bytes_appended': len(content.encode(encoding)),
-                    'operation': 'append'
-                }
+            content = _render(content, input_data)
+            data = content.encode(encoding)
+            
+            await asyncio.to_thread(_append_bytes, file_path, data)
+            result_data = {
+                'path': file_path,
+                'bytes_appended': len(data),
+                'operation': 'append'
+            }
                 
         elif operation == 'delete':
-            if file_path_obj.exists():
-                file_path_obj.unlink()
-                result_data = {
-                    'path': file_path,
-                    'operation': 'delete',
-                    'success': True
-                }
-            else:
+            # unlink reports a missing file itself, so one thread hop covers the check and the delete
+            try:
+                await asyncio.to_thread(file_path_obj.unlink)
+            except FileNotFoundError:
                 raise FileNotFoundError(f"File not found: {file_path}")
+            result_data = {
+                'path': file_path,
+                'operation': 'delete',
+                'success': True
+            }
                 
         elif operation == 'list':
             dir_path = file_path_obj if file_path_obj.is_dir() else file_path_obj.parent
-            files = [str(f) for f in dir_path.iterdir()]
+            files = await asyncio.to_thread(_list_dir, dir_path)
             result_data = {
                 'path': str(dir_path),
                 'files': files,
@@ -738,7 +1636,7 @@ async def execute_file_operation(config: Dict[str, Any], input_data: Any) -> Dic
                 'operation': 'list'
             }
             
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
         
         return {
             'status': 'success',
@@ -757,6 +1655,66 @@ async def execute_file_operation(config: Dict[str, Any], input_data: Any) -> Dic
             'stderr': str(e)
         }
 
+# Condition operators, looked up once per evaluation instead of an if/elif chain
+_CONDITION_OPS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '>': operator.gt,
+    '<': operator.lt,
+    '>=': operator.ge,
+    '<=': operator.le,
+    'contains': lambda field_value, value: value in str(field_value),
+    'exists': lambda field_value, value: field_value is not None,
+}
+# Numeric condition values like "42", "-3" or "2.5"
+_NUM_RE = re.compile(r'-?(?:[0-9]+\.?[0-9]*|\.[0-9]+)')
+
+@functools.lru_cache(maxsize=256, typed=True)
+def _compile_condition(field: str, op_name: str, value: Any) -> tuple:
+    """Split the field path, resolve the operator and cast numeric values once per condition"""
+    # Convert numeric strings for comparison
+    if isinstance(value, str) and _NUM_RE.fullmatch(value):
+        value = float(value) if '.' in value else int(value)
+    return tuple(field.split('.')), op_name, _CONDITION_OPS.get(op_name), value
+
+def _evaluate_condition(condition_config, data):
+    """Evaluate a single condition against the input data"""
+    field = condition_config.get('field', '')
+    op_name = condition_config.get('operator', '==')
+    value = condition_config.get('value', '')
+    try:
+        # Conditions are static config, so foreach iterations reuse the compiled form
+        path, op_name, op_fn, value = _compile_condition(field, op_name, value)
+    except TypeError:
+        # Unhashable value (list/dict) - compile without caching
+        path, op_name, op_fn, value = _compile_condition.__wrapped__(field, op_name, value)
+    
+    # Extract field value from input data (support nested paths like "metadata.totalValue")
+    field_value = None
+    if isinstance(data, dict):
+        field_value = data
+        for part in path:
+            if isinstance(field_value, dict):
+                field_value = field_value.get(part)
+            else:
+                field_value = None
+                break
+    else:
+        field_value = data
+    
+    # Handle None values - can't compare None with numbers
+    if field_value is None:
+        # != is the only operator that can match a missing field
+        return op_name == '!=' and value is not None
+    
+    if op_fn is None:
+        return False
+    try:
+        return op_fn(field_value, value)
+    except (TypeError, ValueError):
+        # If comparison fails (e.g., comparing incompatible types), return False
+        return False
+
 async def execute_conditional_logic(config: Dict[str, Any], input_data: Any) -> Dict[str, Any]:
     """Execute conditional logic"""
     try:
@@ -764,78 +1722,7 @@ async def execute_conditional_logic(config: Dict[str, Any], input_data: Any) ->
         conditions = config.get('conditions', [])
         default_output = config.get('default', input_data)
         
-        start_time = time.time()
-        
-        # Helper function to evaluate conditions
-        def evaluate_condition(condition_config, data):
-            field = condition_config.get('field', '')
-            operator = condition_config.get('operator', '==')
-            value = condition_config.get('value', '')
-            
-            # Extract field value from input data (support nested paths like "metadata.totalValue")
-            field_value = None
-            if isinstance(data, dict):
-                # Handle nested field paths (e.g., "metadata.totalValue")
-                if '.' in field:
-                    parts = field.split('.')
-                    current = data
-                    try:
-                        for part in parts:
-                            if isinstance(current, dict):
-                                current = current.get(part)
-                            else:
-                                current = None
-                                break
-                        field_value = current
-                    except (AttributeError, TypeError, KeyError):
-                        field_value = None
-                else:
-                    field_value = data.get(field, None)
-            else:
-                field_value = data
-            
-            # Handle None values - can't compare None with numbers
-            if field_value is None:
-                if operator == 'exists':
-                    return False
-                elif operator == '!=':
-                    return value is not None
-                else:
-                    # For comparison operators, None values should return False
-                    return False
-            
-            # Convert types for comparison
-            try:
-                if isinstance(value, str) and value.isdigit():
-                    value = int(value)
-                elif isinstance(value, str) and value.replace('.', '', 1).isdigit():
-                    value = float(value)
-            except:
-                pass
-            
-            # Evaluate condition
-            try:
-                if operator == '==':
-                    return field_value == value
-                elif operator == '!=':
-                    return field_value != value
-                elif operator == '>':
-                    return field_value > value
-                elif operator == '<':
-                    return field_value < value
-                elif operator == '>=':
-                    return field_value >= value
-                elif operator == '<=':
-                    return field_value <= value
-                elif operator == 'contains':
-                    return value in str(field_value)
-                elif operator == 'exists':
-                    return field_value is not None
-                else:
-                    return False
-            except (TypeError, ValueError) as e:
-                # If comparison fails (e.g., comparing incompatible types), return False
-                return False
+        start_time = time.perf_counter()
         
         result_output = default_output
         matched_condition = None
@@ -844,12 +1731,12 @@ async def execute_conditional_logic(config: Dict[str, Any], input_data: Any) ->
             condition_expr = condition.get('condition', {})
             condition_output = condition.get('output', input_data)
             
-            if evaluate_condition(condition_expr, input_data):
+            if _evaluate_condition(condition_expr, input_data):
                 result_output = condition_output
                 matched_condition = i
                 break
         
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
         
         # Flatten the output: merge result_output fields into the main output
         # This ensures route/action/priority are available to downstream nodes
@@ -887,7 +1774,6 @@ def validate_extension_path(extension_path: str) -> tuple[bool, str]:
     Returns:
         (is_valid, error_message_or_validated_path)
     """
-    import sys
     
     # Allowed extension filenames (sqlite-vec)
     allowed_extensions = {'vec0.so', 'vec0.dylib', 'vec0.dll'}
@@ -938,8 +1824,91 @@ def validate_extension_path(extension_path: str) -> tuple[bool, str]:
     
     return True, str(full_path)
 
+SQLITE_STATEMENT_CACHE_SIZE = 256
+# Rows pulled per fetchmany() call when building select results
+SQLITE_FETCH_BATCH = 1000
+_LOAD_EXTENSION_RE = re.compile(r'load_extension\s*\(\s*["\']([^"\']+)["\']\s*\)', re.IGNORECASE)
+
+# Connections kept open per database file; queries beyond this wait for a free one
+SQLITE_POOL_SIZE = max(1, int(os.getenv('SQLITE_POOL_SIZE', 4)))
+
+class _PooledSqliteConnection:
+    """SQLite connection checked out of a database's pool by one query at a time"""
+    
+    def __init__(self, database: str):
+        # Repeated node queries reuse prepared statements from the connection's statement cache
+        self.conn = sqlite3.connect(database, check_same_thread=False, cached_statements=SQLITE_STATEMENT_CACHE_SIZE)
+        self.conn.row_factory = sqlite3.Row  # For dict-like access
+        self.conn.execute('PRAGMA journal_mode=WAL')
+        self.conn.execute('PRAGMA synchronous=NORMAL')
+        self.conn.execute('PRAGMA cache_size=-64000')
+        self.conn.execute('PRAGMA temp_store=MEMORY')
+        self.loaded_extensions = set()
+
+class _SqlitePool:
+    """Bounded set of connections to one database file, opened on demand"""
+    
+    def __init__(self, database: str):
+        self.database = database
+        self.idle: "queue.Queue[_PooledSqliteConnection]" = queue.Queue()
+        self.connections: List[_PooledSqliteConnection] = []
+        self.lock = threading.Lock()
+    
+    def acquire(self) -> _PooledSqliteConnection:
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            if len(self.connections) < SQLITE_POOL_SIZE:
+                pooled = _PooledSqliteConnection(self.database)
+                self.connections.append(pooled)
+                return pooled
+        return self.idle.get()
+    
+    def release(self, pooled: _PooledSqliteConnection):
+        self.idle.put(pooled)
+
+# Pools keyed by database path, so queries skip the per-call open and journal setup
+_SQLITE_POOLS: Dict[str, _SqlitePool] = {}
+_SQLITE_POOLS_LOCK = threading.Lock()
+
+@contextmanager
+def _sqlite_connection(database: str):
+    """Check a connection out of the database's pool and return it when the query is done"""
+    with _SQLITE_POOLS_LOCK:
+        pool = _SQLITE_POOLS.get(database)
+        if pool is None:
+            pool = _SqlitePool(database)
+            _SQLITE_POOLS[database] = pool
+    pooled = pool.acquire()
+    try:
+        yield pooled
+    finally:
+        pool.release(pooled)
+
+def _close_sqlite_connections():
+    with _SQLITE_POOLS_LOCK:
+        for pool in _SQLITE_POOLS.values():
+            for pooled in pool.connections:
+                pooled.conn.close()
+        _SQLITE_POOLS.clear()
+
+def _vec0_json(values: Any) -> str:
+    """JSON array text for a vec0 MATCH parameter - embeddings can be thousands of floats"""
+    try:
+        return _json_dumps_str(values)
+    except TypeError:
+        # orjson rejects numpy scalars and other float subclasses
+        return json.dumps(values)
+
 async def execute_database_query(config: Dict[str, Any], input_data: Any) -> Dict[str, Any]:
     """Execute database query (SQLite only for security)"""
+    # sqlite3 calls block, so run the whole query in a worker thread
+    return await asyncio.to_thread(_execute_database_query_sync, config, input_data)
+
+def _execute_database_query_sync(config: Dict[str, Any], input_data: Any) -> Dict[str, Any]:
+    """Run a database query on the pooled connection for its database file"""
     try:
         query = config.get('query', '')
         params = config.get('params', [])
@@ -953,15 +1922,13 @@ async def execute_database_query(config: Dict[str, Any], input_data: Any) -> Dic
         if not database.startswith('/tmp/workflow_dbs/'):
             database = str(safe_db_dir / Path(database).name)
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Replace query placeholders with input data
         processed_params = []
         
         # First, replace {key} placeholders in the query string
-        if isinstance(input_data, dict):
-            for key, value in input_data.items():
-                query = query.replace(f'{{{key}}}', str(value))
+        query = _render(query, input_data)
         
         # Now process parameters from the config params array
         # These are the actual parameters that will be bound to ? placeholders
@@ -974,14 +1941,13 @@ async def execute_database_query(config: Dict[str, Any], input_data: Any) -> Dic
                     
                     # Check if this is a vec0 MATCH query - vec0 requires JSON array format as a STRING
                     if 'MATCH' in query.upper():
-                        import json
                         # For vec0 MATCH queries, prefer the _array version if available
                         array_key = f'{key}_array'
                         if array_key in input_data:
                             # Convert list to JSON string for vec0
                             embedding_array = input_data[array_key]
                             if isinstance(embedding_array, list):
-                                processed_params.append(json.dumps(embedding_array))
+                                processed_params.append(_vec0_json(embedding_array))
                             else:
                                 processed_params.append(embedding_array)
                         elif isinstance(value, bytes):
@@ -990,7 +1956,7 @@ async def execute_database_query(config: Dict[str, Any], input_data: Any) -> Dic
                             try:
                                 # Assume float32 format (as stored by embedding node)
                                 embedding_array = np.frombuffer(value, dtype=np.float32).tolist()
-                                processed_params.append(json.dumps(embedding_array))
+                                processed_params.append(_vec0_json(embedding_array))
                             except Exception as e:
                                 # Fallback: use the bytes value (might fail, but at least try)
                                 processed_params.append(value)
@@ -1000,22 +1966,21 @@ async def execute_database_query(config: Dict[str, Any], input_data: Any) -> Dic
                                 processed_params.append(value)
                             else:
                                 # Might be base64 encoded - try to decode and convert
-                                import base64
                                 import numpy as np
                                 try:
                                     decoded_bytes = base64.b64decode(value)
                                     embedding_array = np.frombuffer(decoded_bytes, dtype=np.float32).tolist()
-                                    processed_params.append(json.dumps(embedding_array))
+                                    processed_params.append(_vec0_json(embedding_array))
                                 except Exception:
                                     # Not base64, use as-is (might fail, but let vec0 handle the error)
                                     processed_params.append(value)
                         elif isinstance(value, list):
                             # Already a list, convert to JSON string
-                            processed_params.append(json.dumps(value))
+                            processed_params.append(_vec0_json(value))
                         else:
                             # Other format - try to convert to JSON string
                             try:
-                                processed_params.append(json.dumps(value))
+                                processed_params.append(_vec0_json(value))
                             except Exception:
                                 processed_params.append(value)
                     else:
@@ -1029,13 +1994,14 @@ async def execute_database_query(config: Dict[str, Any], input_data: Any) -> Dic
                 processed_params.append(param_template)
         
         # Check if query contains load_extension call
-        import re
-        load_ext_pattern = r'load_extension\s*\(\s*["\']([^"\']+)["\']\s*\)'
-        load_ext_match = re.search(load_ext_pattern, query, re.IGNORECASE)
+        load_ext_match = _LOAD_EXTENSION_RE.search(query)
         
-        with sqlite3.connect(database) as conn:
+        with _sqlite_connection(database) as pooled, pooled.conn as conn:
             # Check if extension loading is supported
             extension_loading_supported = hasattr(conn, 'enable_load_extension')
+            if extension_loading_supported:
+                # A previous query may have enabled loading on this pooled connection
+                conn.enable_load_extension(False)
             
             # Check if query uses vec0 (needs extension loaded)
             # This includes CREATE VIRTUAL TABLE ... USING vec0(...)
@@ -1103,7 +2069,6 @@ async def execute_database_query(config: Dict[str, Any], input_data: Any) -> Dic
                 
                 # SQLite on macOS/Linux automatically appends platform-specific extensions
                 # So we need to remove the extension to avoid double extension (.dylib.dylib)
-                import sys
                 if sys.platform == 'darwin' and validated_path_abs.endswith('.dylib'):
                     # Remove .dylib - SQLite will add it automatically
                     validated_path_abs = validated_path_abs[:-6]
@@ -1126,7 +2091,6 @@ async def execute_database_query(config: Dict[str, Any], input_data: Any) -> Dic
                     try:
                         conn.enable_load_extension(True)
                         # Get the extension path (platform-specific)
-                        import sys
                         safe_dir = Path('/tmp/workflow_files')
                         if sys.platform == 'darwin':
                             ext_file = safe_dir / 'vec0.dylib'
@@ -1144,7 +2108,9 @@ async def execute_database_query(config: Dict[str, Any], input_data: Any) -> Dic
                         # Check if extension file exists
                         if ext_path and ext_file.exists():
                             try:
-                                conn.load_extension(ext_path)
+                                if ext_path not in pooled.loaded_extensions:
+                                    conn.load_extension(ext_path)
+                                    pooled.loaded_extensions.add(ext_path)
                             except Exception as e:
                                 return {
                                     'status': 'error',
@@ -1170,7 +2136,6 @@ async def execute_database_query(config: Dict[str, Any], input_data: Any) -> Dic
                             'stderr': str(e)
                         }
             
-            conn.row_factory = sqlite3.Row  # For dict-like access
             cursor = conn.cursor()
             
             # Preserve original input data (workflow context) for passing through
@@ -1187,8 +2152,12 @@ async def execute_database_query(config: Dict[str, Any], input_data: Any) -> Dic
                     cursor.execute(statements[-1], processed_params)
                 else:
                     cursor.execute(query, processed_params)
-                rows = cursor.fetchall()
-                result_data = [dict(row) for row in rows]
+                # Convert rows in batches so the raw Row list never holds the whole result
+                result_data = []
+                rows = cursor.fetchmany(SQLITE_FETCH_BATCH)
+                while rows:
+                    result_data.extend(dict(row) for row in rows)
+                    rows = cursor.fetchmany(SQLITE_FETCH_BATCH)
                 
             elif operation in ['insert', 'update', 'delete']:
                 if len(statements) > 1:
@@ -1248,7 +2217,7 @@ async def execute_database_query(config: Dict[str, Any], input_data: Any) -> Dic
                 'query': query[:100] + '...' if len(query) > 100 else query
             }
         
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
         
         return {
             'status': 'success',
@@ -1267,67 +2236,77 @@ async def execute_database_query(config: Dict[str, Any], input_data: Any) -> Dic
             'stderr': str(e)
         }
 
+def _parse_allowed_ollama_hosts():
+    """Split ALLOWED_OLLAMA_HOSTS into exact hostnames and CIDR networks"""
+    hosts = set()
+    networks = []
+    for allowed in os.getenv('ALLOWED_OLLAMA_HOSTS', 'localhost,127.0.0.1,192.168.0.0/16,10.0.0.0/8').split(','):
+        allowed = allowed.strip()
+        hosts.add(allowed)
+        if '/' in allowed:
+            try:
+                networks.append(ipaddress.ip_network(allowed, strict=False))
+            except ValueError:
+                continue
+    # localhost is always allowed
+    hosts.update(('localhost', '127.0.0.1'))
+    return frozenset(hosts), tuple(networks)
+
+# Parsed once at import instead of on every LLM request
+_ALLOWED_OLLAMA_HOSTS, _ALLOWED_OLLAMA_NETWORKS = _parse_allowed_ollama_hosts()
+# Hostname of "host", "host:port" or "scheme://user@host:port/path", including bracketed IPv6
+_HOST_RE = re.compile(r'(?:[A-Za-z][\w+.-]*://)?(?:[^@/?#]*@)?(?:\[([^\]]*)\]|([^:/?#]*))')
+
+@functools.lru_cache(maxsize=256)
 def is_local_network_host(host: str) -> bool:
     """Check if host is in allowed local network ranges"""
     try:
-        # Parse URL to get hostname
-        from urllib.parse import urlparse
-        parsed = urlparse(host if '://' in host else f'http://{host}')
-        hostname = parsed.hostname
+        # Extract the hostname with one regex match instead of a full urlparse
+        match = _HOST_RE.match(host)
+        hostname = (match.group(1) or match.group(2)).lower()
         
         if not hostname:
             return False
-            
-        # Check against allowed patterns
-        allowed_hosts = os.getenv('ALLOWED_OLLAMA_HOSTS', 'localhost,127.0.0.1,192.168.0.0/16,10.0.0.0/8').split(',')
+        if hostname in _ALLOWED_OLLAMA_HOSTS:
+            return True
+        if not _ALLOWED_OLLAMA_NETWORKS:
+            return False
         
-        for allowed in allowed_hosts:
-            allowed = allowed.strip()
-            if hostname == allowed:
-                return True
-            if hostname == 'localhost' or hostname == '127.0.0.1':
-                return True
-            # Check CIDR ranges
-            if '/' in allowed:
-                try:
-                    network = ipaddress.ip_network(allowed, strict=False)
-                    host_ip = ipaddress.ip_address(hostname)
-                    if host_ip in network:
-                        return True
-                except:
-                    continue
-        return False
+        # Check CIDR ranges
+        try:
+            host_ip = ipaddress.ip_address(hostname)
+        except ValueError:
+            return False
+        return any(host_ip in network for network in _ALLOWED_OLLAMA_NETWORKS)
     except:
         return False
 
+# Common markdown patterns, combined so each line needs a single search
+_MARKDOWN_PATTERNS = (
+    r'^#{1,6}\s+',  # Headers (#, ##, ###, etc.)
+    r'\*\*.*?\*\*',  # Bold (**text**)
+    r'\*.*?\*',  # Italic (*text*)
+    r'\[.*?\]\(.*?\)',  # Links [text](url)
+    r'```',  # Code blocks
+    r'^\s*[-*+]\s+',  # Unordered lists
+    r'^\s*\d+\.\s+',  # Ordered lists
+    r'^\s*>\s+',  # Blockquotes
+    r'`[^`]+`',  # Inline code
+    r'^\s*\|.*\|',  # Tables
+)
+_MARKDOWN_LINE_RE = re.compile('|'.join(f'(?:{pattern})' for pattern in _MARKDOWN_PATTERNS), re.MULTILINE)
+
 def detect_markdown(text: str) -> bool:
     """Detect if a string contains markdown content"""
     if not isinstance(text, str) or len(text.strip()) == 0:
         return False
     
-    # Common markdown patterns
-    markdown_patterns = [
-        r'^#{1,6}\s+',  # Headers (#, ##, ###, etc.)
-        r'\*\*.*?\*\*',  # Bold (**text**)
-        r'\*.*?\*',  # Italic (*text*)
-        r'\[.*?\]\(.*?\)',  # Links [text](url)
-        r'```',  # Code blocks
-        r'^\s*[-*+]\s+',  # Unordered lists
-        r'^\s*\d+\.\s+',  # Ordered lists
-        r'^\s*>\s+',  # Blockquotes
-        r'`[^`]+`',  # Inline code
-        r'^\s*\|.*\|',  # Tables
-    ]
-    
-    import re
     text_lines = text.split('\n')
     markdown_score = 0
     
     for line in text_lines[:50]:  # Check first 50 lines
-        for pattern in markdown_patterns:
-            if re.search(pattern, line, re.MULTILINE):
-                markdown_score += 1
-                break
+        if _MARKDOWN_LINE_RE.search(line):
+            markdown_score += 1
     
     # If we find multiple markdown patterns, it's likely markdown
     return markdown_score >= 2
@@ -1414,7 +2393,6 @@ async def execute_markdown_viewer(config: Dict[str, Any], input_data: Any) -> Di
                     detected_key = string_values[0][0]
                 else:
                     # Last resort: convert to JSON string (formatted)
-                    import json
                     markdown_content = json.dumps(input_data, indent=2)
                     detected_key = 'json'
             else:
@@ -1442,42 +2420,51 @@ async def execute_markdown_viewer(config: Dict[str, Any], input_data: Any) -> Di
             'stderr': str(e)
         }
 
+# Common HTML patterns
+_HTML_PATTERNS = tuple(re.compile(pattern, re.IGNORECASE) for pattern in (
+    r'<html[^>]*>',
+    r'<body[^>]*>',
+    r'<div[^>]*>',
+    r'<p[^>]*>',
+    r'<h[1-6][^>]*>',
+    r'<span[^>]*>',
+    r'<a[^>]*href',
+    r'<img[^>]*src',
+    r'<table[^>]*>',
+    r'<ul[^>]*>',
+    r'<ol[^>]*>',
+    r'<li[^>]*>',
+    r'<br\s*/?>',
+    r'</[^>]+>',  # Closing tags
+))
+
 def detect_html(text: str) -> bool:
     """Detect if a string contains HTML content"""
     if not isinstance(text, str) or len(text.strip()) == 0:
         return False
     
-    # Common HTML patterns
-    html_patterns = [
-        r'<html[^>]*>',
-        r'<body[^>]*>',
-        r'<div[^>]*>',
-        r'<p[^>]*>',
-        r'<h[1-6][^>]*>',
-        r'<span[^>]*>',
-        r'<a[^>]*href',
-        r'<img[^>]*src',
-        r'<table[^>]*>',
-        r'<ul[^>]*>',
-        r'<ol[^>]*>',
-        r'<li[^>]*>',
-        r'<br\s*/?>',
-        r'</[^>]+>',  # Closing tags
-    ]
-    
-    import re
     html_score = 0
     
-    for pattern in html_patterns:
-        if re.search(pattern, text, re.IGNORECASE):
+    for pattern in _HTML_PATTERNS:
+        if pattern.search(text):
             html_score += 1
+            # If we find multiple HTML patterns, it's likely HTML
+            if html_score >= 2:
+                return True
     
-    # If we find multiple HTML patterns, it's likely HTML
-    return html_score >= 2
+    return False
 
 # Global model cache for sentence-transformers (per-process)
 _embedding_model_cache: Dict[str, Any] = {}
 
+def _load_embedding_model(model_name: str) -> Any:
+    """Return the cached sentence-transformers model, loading it on first use"""
+    model = _embedding_model_cache.get(model_name)
+    if model is None:
+        from sentence_transformers import SentenceTransformer
+        model = _embedding_model_cache[model_name] = SentenceTransformer(model_name)
+    return model
+
 async def execute_embedding_node(config: Dict[str, Any], input_data: Any) -> Dict[str, Any]:
     """Execute embedding node - generate vector embeddings from text using sentence-transformers"""
     try:
@@ -1486,13 +2473,12 @@ async def execute_embedding_node(config: Dict[str, Any], input_data: Any) -> Dic
         output_field = config.get('output_field', 'embedding')
         format_type = config.get('format', 'blob')  # 'blob' or 'array'
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Load or get cached model
         if model_name not in _embedding_model_cache:
             try:
-                from sentence_transformers import SentenceTransformer
-                _embedding_model_cache[model_name] = SentenceTransformer(model_name)
+                _load_embedding_model(model_name)
             except ImportError as e:
                 return {
                     'status': 'error',
@@ -1591,7 +2577,7 @@ async def execute_embedding_node(config: Dict[str, Any], input_data: Any) -> Dic
                 'count': len(texts)
             }
         
-        execution_time = time.time() - start_time
+        execution_time = time.perf_counter() - start_time
         
         return {
             'status': 'success',
@@ -1695,7 +2681,6 @@ async def execute_html_viewer(config: Dict[str, Any], input_data: Any) -> Dict[s
 async def execute_json_viewer(config: Dict[str, Any], input_data: Any) -> Dict[str, Any]:
     """Execute JSON viewer node - automatically detects and formats JSON in any variable"""
     try:
-        import json
         # Get content_key from config, default to empty string to differentiate from explicit 'content'
         content_key = config.get('content_key', '')
         # Check if content_key was explicitly set (not empty and not None)
@@ -1703,15 +2688,15 @@ async def execute_json_viewer(config: Dict[str, Any], input_data: Any) -> Dict[s
         json_content = None
         detected_key = None
         
-        # Helper function to check if a string is valid JSON
-        def is_json_string(text: str) -> bool:
+        # Helper function to parse a string as JSON once, returning not_json if it isn't valid JSON
+        not_json = object()
+        def parse_json_string(text: str) -> Any:
             if not isinstance(text, str) or len(text.strip()) == 0:
-                return False
+                return not_json
             try:
-                json.loads(text)
-                return True
-            except:
-                return False
+                return _json_loads(text)
+            except Exception:
+                return not_json
         
         # Helper function to get value from nested dict using dot notation (e.g., 'output.data')
         def get_nested_value(obj: Any, key_path: str) -> Any:
@@ -1805,8 +2790,9 @@ async def execute_json_viewer(config: Dict[str, Any], input_data: Any) -> Dict[s
                     detected_key = single_key
                 # If it's a string, check if it's a JSON string first
                 elif isinstance(single_value, str):
-                    if is_json_string(single_value):
-                        json_content = json.loads(single_value)
+                    parsed = parse_json_string(single_value)
+                    if parsed is not not_json:
+                        json_content = parsed
                         detected_key = single_key
                     else:
                         json_content = {"value": single_value, "path": single_key, "type": "string"}
@@ -1835,10 +2821,12 @@ async def execute_json_viewer(config: Dict[str, Any], input_data: Any) -> Dict[s
                         json_content = candidate
                         detected_key = key
                         break
-                    elif isinstance(candidate, str) and is_json_string(candidate):
-                        json_content = json.loads(candidate)
-                        detected_key = key
-                        break
+                    elif isinstance(candidate, str):
+                        parsed = parse_json_string(candidate)
+                        if parsed is not not_json:
+                            json_content = parsed
+                            detected_key = key
+                            break
             
             # If still not found, scan all variables
             if json_content is None:
@@ -1849,19 +2837,23 @@ async def execute_json_viewer(config: Dict[str, Any], input_data: Any) -> Dict[s
                         detected_key = key
                         break
                     # If it's a string, try to parse as JSON
-                    elif isinstance(value, str) and is_json_string(value):
-                        json_content = json.loads(value)
-                        detected_key = key
-                        break
+                    elif isinstance(value, str):
+                        parsed = parse_json_string(value)
+                        if parsed is not not_json:
+                            json_content = parsed
+                            detected_key = key
+                            break
         
         # Priority 4: If input_data itself is a dict/list, use it (only if auto-detect is enabled)
         if should_auto_detect and json_content is None:
             if isinstance(input_data, (dict, list)):
                 json_content = input_data
                 detected_key = 'input'
-            elif isinstance(input_data, str) and is_json_string(input_data):
-                json_content = json.loads(input_data)
-                detected_key = 'input'
+            elif isinstance(input_data, str):
+                parsed = parse_json_string(input_data)
+                if parsed is not not_json:
+                    json_content = parsed
+                    detected_key = 'input'
         
         # Final fallback: convert entire input_data to JSON (only if auto-detect)
         if should_auto_detect and json_content is None:
@@ -1874,19 +2866,21 @@ async def execute_json_viewer(config: Dict[str, Any], input_data: Any) -> Dict[s
             detected_key = 'input'
         
         # Format JSON with indentation
-        json_string = json.dumps(json_content, indent=2, ensure_ascii=False)
+        json_string = _json_pretty(json_content)
         
         # Output structure: return the extracted keys as the main output
         # This allows downstream nodes to use the selected keys
         output_data = json_content  # The extracted/selected keys
         
         # Prepare full JSON for the "Full JSON" tab
-        full_json_string = json.dumps(input_data, indent=2, ensure_ascii=False) if isinstance(input_data, dict) else json.dumps(input_data, indent=2, ensure_ascii=False)
+        full_json_string = _json_pretty(input_data)
         
         # Store viewer_data inside output so it's preserved when stored in node_outputs
         # But also keep the extracted keys as the main data for downstream nodes
         # IMPORTANT: Only store JSON strings, not objects, to avoid circular references
         if isinstance(output_data, dict):
+            # Copy first: output_data may be an upstream node's output, which must not change
+            output_data = output_data.copy()
             output_data['_viewer_data'] = {
                 'content': json_string,  # Formatted JSON string for display (filtered)
                 'json_data': json_string,  # Store as string to avoid circular references
@@ -1930,9 +2924,6 @@ async def execute_json_viewer(config: Dict[str, Any], input_data: Any) -> Dict[s
 async def execute_image_viewer(config: Dict[str, Any], input_data: Any) -> Dict[str, Any]:
     """Execute image viewer node - automatically detects image data (base64, file paths, URLs)"""
     try:
-        import base64
-        import re
-        from urllib.parse import urlparse
         
         content_key = config.get('content_key', '')
         content_key_explicitly_set = bool(content_key and content_key.strip())
@@ -2309,9 +3300,6 @@ async def execute_image_viewer(config: Dict[str, Any], input_data: Any) -> Dict[
 async def execute_ocr_node(config: Dict[str, Any], input_data: Any) -> Dict[str, Any]:
     """Execute OCR node - extract text from images using Tesseract OCR"""
     try:
-        import base64
-        import io
-        from pathlib import Path
         from PIL import Image
         import pytesseract
         
@@ -2497,8 +3485,6 @@ async def execute_browser_node(config: Dict[str, Any], input_data: Any, node_out
     """Execute browser automation using Playwright"""
     try:
         from playwright.async_api import async_playwright, Browser, BrowserContext, Page
-        import base64
-        import random
     except ImportError:
         return {
             'status': 'error',
@@ -2527,22 +3513,7 @@ async def execute_browser_node(config: Dict[str, Any], input_data: Any, node_out
         timeout = config.get('timeout', 60000)
         
         # Replace placeholders in URL with input data
-        def replace_placeholders(obj, data):
-            if isinstance(obj, str):
-                try:
-                    import re
-                    for key, value in (data.items() if isinstance(data, dict) else {}):
-                        obj = obj.replace(f'{{{key}}}', str(value))
-                    return obj
-                except:
-                    return obj
-            elif isinstance(obj, dict):
-                return {k: replace_placeholders(v, data) for k, v in obj.items()}
-            elif isinstance(obj, list):
-                return [replace_placeholders(item, data) for item in obj]
-            return obj
-        
-        processed_url = replace_placeholders(url, input_data)
+        processed_url = _render_obj(url, input_data)
         
         if not processed_url:
             return {
@@ -2553,7 +3524,7 @@ async def execute_browser_node(config: Dict[str, Any], input_data: Any, node_out
                 'stderr': 'URL not provided'
             }
         
-        start_time = time.time()
+        start_time = time.perf_counter()
         
         # Session persistence paths
         session_dir = Path(f'/tmp/workflow_files/browser_sessions/{session_id}')
@@ -2585,20 +3556,20 @@ async def execute_browser_node(config: Dict[str, Any], input_data: Any, node_out
                 browser_type = 'chromium'
             except Exception as e:
                 launch_error = str(e)
-                print(f"Chromium launch failed: {e}, trying Firefox...")
+                logger.warning("Chromium launch failed: %s, trying Firefox...", e)
                 # Fallback to Firefox
                 try:
                     browser = await p.firefox.launch(headless=headless)
                     browser_type = 'firefox'
-                    print("Using Firefox as fallback")
+                    logger.info("Using Firefox as fallback")
                 except Exception as e2:
                     launch_error = f"Chromium: {launch_error}, Firefox: {str(e2)}"
-                    print(f"Firefox launch failed: {e2}, trying WebKit...")
+                    logger.warning("Firefox launch failed: %s, trying WebKit...", e2)
                     # Fallback to WebKit
                     try:
                         browser = await p.webkit.launch(headless=headless)
                         browser_type = 'webkit'
-                        print("Using WebKit as fallback")
+                        logger.info("Using WebKit as fallback")
                     except Exception as e3:
                         return {
                             'status': 'error',
@@ -2645,7 +3616,7 @@ async def execute_browser_node(config: Dict[str, Any], input_data: Any, node_out
                             cookies = json.loads(cookies_data)
                             await context.add_cookies(cookies)
                     except Exception as e:
-                        print(f"Warning: Failed to load cookies: {e}")
+                        logger.warning("Failed to load cookies: %s", e)
                 
                 # Create page
                 page = await context.new_page()
@@ -2676,13 +3647,13 @@ async def execute_browser_node(config: Dict[str, Any], input_data: Any, node_out
                         try:
                             await page.wait_for_selector(wait_selector, timeout=wait_timeout)
                         except Exception as e:
-                            print(f"Warning: Selector wait failed: {e}")
+                            logger.warning("Selector wait failed: %s", e)
                 
                 if wait_for in ('network_idle', 'both'):
                     try:
                         await page.wait_for_load_state('networkidle', timeout=wait_timeout)
                     except Exception as e:
-                        print(f"Warning: Network idle wait failed: {e}")
+                        logger.warning("Network idle wait failed: %s", e)
                 
                 # Collect outputs
                 output_data = {}
@@ -2740,7 +3711,7 @@ async def execute_browser_node(config: Dict[str, Any], input_data: Any, node_out
                                     else:
                                         extracted_data[key] = None
                                 except Exception as e:
-                                    print(f"Warning: Selector '{selector}' failed: {e}")
+                                    logger.warning("Selector '%s' failed: %s", selector, e)
                                     extracted_data[key] = None
                             
                             output_data['json'] = extracted_data
@@ -2835,9 +3806,9 @@ Return ONLY valid JSON, no markdown formatting, no explanations."""
                         async with aiofiles.open(cookies_file, 'w') as f:
                             await f.write(json.dumps(cookies, indent=2))
                     except Exception as e:
-                        print(f"Warning: Failed to save cookies: {e}")
+                        logger.warning("Failed to save cookies: %s", e)
                 
-                execution_time = time.time() - start_time
+                execution_time = time.perf_counter() - start_time
                 
                 # Merge with input data for downstream nodes
                 if isinstance(input_data, dict):
@@ -2884,6 +3855,244 @@ Return ONLY valid JSON, no markdown formatting, no explanations."""
             'stderr': error_msg
         }
 
+@functools.lru_cache(maxsize=32)
+def _ollama_endpoint(host: str):
+    """Normalize an Ollama host and build its generate URL once per host string"""
+    # Ensure host has proper URL format
+    if not host.startswith('http'):
+        host = f'http://{host}'
+    if not host.endswith('/'):
+        host += '/'
+    # aiohttp uses a prebuilt URL as-is instead of parsing the string on every request
+    return host, URL(f'{host}api/generate')
+
+async def _response_error_detail(response: aiohttp.ClientResponse) -> Any:
+    """Extract the error message from a failed API response, tolerating non-JSON bodies"""
+    body = await _read_http_body(response)
+    try:
+        data = _json_loads(body)
+    except ValueError:
+        return body[:500].decode(response.charset or 'utf-8', errors='replace') or 'Unknown error'
+    return data.get('error', 'Unknown error') if isinstance(data, dict) else data
+
+async def _read_ollama_stream(response: aiohttp.ClientResponse) -> Dict[str, Any]:
+    """Consume a streamed Ollama generate response, returning the final frame with the full text"""
+    parts = []
+    final = {}
+    
+    def handle_line(line: bytes):
+        nonlocal final
+        if not line.strip():
+            return
+        frame = _json_loads(line)
+        if 'error' in frame:
+            raise Exception(f"Ollama API error: {frame['error']}")
+        parts.append(frame.get('response', ''))
+        if frame.get('done'):
+            final = frame
+    
+    buffered = b''
+    received = 0
+    async for chunk in response.content.iter_any():
+        received += len(chunk)
+        if received > HTTP_MAX_RESPONSE_BYTES:
+            raise ValueError(f'Response body exceeds {HTTP_MAX_RESPONSE_BYTES} bytes')
+        buffered += chunk
+        # Frames are newline-delimited JSON; keep any partial trailing frame for the next chunk
+        *lines, buffered = buffered.split(b'\n')
+        for line in lines:
+            handle_line(line)
+    handle_line(buffered)
+    if not final:
+        raise Exception("No response from Ollama")
+    final['response'] = ''.join(parts)
+    return final
+
+async def _read_chat_stream(response: aiohttp.ClientResponse) -> Dict[str, Any]:
+    """Consume a streamed chat completion (server-sent events), returning it in the non-streamed shape"""
+    parts = []
+    finish_reason = None
+    usage = {}
+    
+    def handle_line(line: bytes):
+        nonlocal finish_reason, usage
+        # Chunks arrive as 'data:' fields; blank lines and ': keep-alive' comments carry nothing
+        if not line.startswith(b'data:'):
+            return
+        data = line[5:].strip()
+        if not data or data == b'[DONE]':
+            return
+        chunk = _json_loads(data)
+        if 'error' in chunk:
+            raise Exception(f"Stream error: {chunk['error']}")
+        if chunk.get('usage'):
+            usage = chunk['usage']
+        for choice in chunk.get('choices') or ():
+            if choice.get('index', 0) != 0:
+                continue
+            content = (choice.get('delta') or {}).get('content')
+            if content:
+                parts.append(content)
+            if choice.get('finish_reason'):
+                finish_reason = choice['finish_reason']
+    
+    buffered = b''
+    received = 0
+    async for chunk in response.content.iter_any():
+        received += len(chunk)
+        if received > HTTP_MAX_RESPONSE_BYTES:
+            raise ValueError(f'Response body exceeds {HTTP_MAX_RESPONSE_BYTES} bytes')
+        buffered += chunk
+        # Keep any partial trailing line for the next chunk
+        *lines, buffered = buffered.split(b'\n')
+        for line in lines:
+            handle_line(line.rstrip(b'\r'))
+    handle_line(buffered.rstrip(b'\r'))
+    if not parts and finish_reason is None:
+        raise Exception("No response from LLM")
+    return {
+        'choices': [{'message': {'content': ''.join(parts)}, 'finish_reason': finish_reason or 'unknown'}],
+        'usage': usage
+    }
+
+class LLMResponseCache:
+    """In-memory LRU cache of LLM responses with a time-to-live"""
+    
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.entries: "OrderedDict[str, tuple]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+    
+    @staticmethod
+    def make_key(**fields: Any) -> str:
+        """Hash the request fields that determine a deterministic response"""
+        return hashlib.sha256(json.dumps(fields, sort_keys=True).encode('utf-8')).hexdigest()
+    
+    def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self.entries.get(key)
+        if entry is None or time.monotonic() - entry[0] > self.ttl:
+            if entry is not None:
+                del self.entries[key]
+            self.misses += 1
+            return None
+        self.entries.move_to_end(key)
+        self.hits += 1
+        return entry[1]
+    
+    def set(self, key: str, value: Dict[str, Any]):
+        self.entries[key] = (time.monotonic(), value)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.maxsize:
+            self.entries.popitem(last=False)
+    
+    def stats(self) -> Dict[str, int]:
+        return {'size': len(self.entries), 'hits': self.hits, 'misses': self.misses}
+
+# Responses are only cached for temperature 0, where the same request gives the same answer;
+# nodes opt out with cache: false
+LLM_CACHE = LLMResponseCache(
+    maxsize=int(os.getenv('LLM_CACHE_SIZE', 256)),
+    ttl=float(os.getenv('LLM_CACHE_TTL', 3600))
+)
+
+class SemanticLLMCache:
+    """LLM outputs indexed by normalized prompt embeddings, matched by cosine similarity"""
+    
+    def __init__(self, maxsize: int, model_name: str):
+        self.maxsize = maxsize
+        self.model_name = model_name
+        # namespace -> [embedding matrix, outputs, next slot to overwrite once full]
+        self.namespaces: Dict[tuple, list] = {}
+        self.hits = 0
+        self.misses = 0
+    
+    def embed(self, text: str) -> Any:
+        """Embed a prompt as a unit vector - blocking, so callers run it in a thread"""
+        import numpy as np
+        model = _load_embedding_model(self.model_name)
+        return model.encode([text], convert_to_numpy=True, normalize_embeddings=True)[0].astype(np.float32)
+    
+    def lookup(self, namespace: tuple, vector: Any, threshold: float) -> Optional[tuple]:
+        """Return (output, similarity) for the closest cached prompt at or above threshold"""
+        entry = self.namespaces.get(namespace)
+        if entry is not None and entry[1]:
+            # Rows are unit vectors, so one matrix-vector product gives every cosine similarity
+            similarities = entry[0][:len(entry[1])] @ vector
+            best = int(similarities.argmax())
+            if similarities[best] >= threshold:
+                self.hits += 1
+                return entry[1][best], float(similarities[best])
+        self.misses += 1
+        return None
+    
+    def add(self, namespace: tuple, vector: Any, output: Dict[str, Any]):
+        import numpy as np
+        entry = self.namespaces.get(namespace)
+        if entry is None:
+            entry = self.namespaces[namespace] = [
+                np.empty((min(16, self.maxsize), vector.shape[0]), dtype=np.float32), [], 0
+            ]
+        matrix, outputs = entry[0], entry[1]
+        if len(outputs) < self.maxsize:
+            if len(outputs) == len(matrix):
+                # Double the buffer so appends stay amortized O(1)
+                grown = np.empty((min(2 * len(matrix), self.maxsize), matrix.shape[1]), dtype=np.float32)
+                grown[:len(matrix)] = matrix
+                entry[0] = matrix = grown
+            matrix[len(outputs)] = vector
+            outputs.append(output)
+        else:
+            # Full - overwrite the oldest entry
+            slot = entry[2]
+            matrix[slot] = vector
+            outputs[slot] = output
+            entry[2] = (slot + 1) % self.maxsize
+    
+    def stats(self) -> Dict[str, int]:
+        return {
+            'size': sum(len(entry[1]) for entry in self.namespaces.values()),
+            'hits': self.hits,
+            'misses': self.misses
+        }
+
+# Opt-in per node with semantic_cache: true - reuses a response for a paraphrased prompt
+LLM_SEMANTIC_CACHE = SemanticLLMCache(
+    maxsize=int(os.getenv('LLM_SEMANTIC_CACHE_SIZE', 1024)),
+    model_name=os.getenv('LLM_SEMANTIC_CACHE_MODEL', 'all-MiniLM-L6-v2')
+)
+
+# Caps in-flight LLM requests so fan-out workflows queue here instead of overloading the
+# model server; match it to the server's concurrency budget (e.g. OLLAMA_NUM_PARALLEL)
+LLM_MAX_CONCURRENCY = int(os.getenv('LLM_MAX_CONCURRENCY', 8))
+LLM_SEMAPHORE = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
+# Fail fast when a provider can't be reached, but only bound the wait between reads once
+# connected, so long generations aren't cut off by a total deadline
+LLM_CONNECT_TIMEOUT = float(os.getenv('LLM_CONNECT_TIMEOUT', 10))
+_LLM_CHAT_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=LLM_CONNECT_TIMEOUT, sock_read=60)
+_OLLAMA_TIMEOUT = aiohttp.ClientTimeout(total=None, sock_connect=LLM_CONNECT_TIMEOUT, sock_read=120)
+
+# Chat completions endpoints for OpenAI-compatible providers (config.base_url overrides)
+_PROVIDER_CHAT_ENDPOINTS = MappingProxyType({
+    'openai': 'https://api.openai.com/v1/chat/completions',
+    'groq': 'https://api.groq.com/openai/v1/chat/completions',
+    'together': 'https://api.together.xyz/v1/chat/completions',
+    'fireworks': 'https://api.fireworks.ai/inference/v1/chat/completions',
+    'deepinfra': 'https://api.deepinfra.com/v1/openai/chat/completions',
+    'perplexity': 'https://api.perplexity.ai/openai/v1/chat/completions',
+    'mistral': 'https://api.mistral.ai/v1/chat/completions',
+})
+_OPENROUTER_HEADERS = MappingProxyType({
+    'HTTP-Referer': 'http://localhost:3000',
+    'X-Title': 'Workflow Builder'
+})
+_NO_HEADERS = MappingProxyType({})
+
+# Any {name} left in a prompt after rendering
+_UNREPLACED_PLACEHOLDER_RE = re.compile(r'\{\w+\}')
+
 async def execute_llm_request(config: Dict[str, Any], input_data: Any) -> Dict[str, Any]:
     """Execute LLM request via OpenRouter, OpenAI-style providers, or Ollama.
 
@@ -2896,6 +4105,9 @@ async def execute_llm_request(config: Dict[str, Any], input_data: Any) -> Dict[s
       - user: user prompt text (upstream input is appended)
       - api_key: optional per-node API key override
       - api_key_name: optional env var name (legacy)
+      - cache: optional, false disables response caching at temperature 0
+      - semantic_cache: optional, true reuses responses for similar prompts
+      - semantic_threshold: optional cosine similarity for a semantic hit, default 0.95
     """
     try:
         provider = config.get('provider') or 'openrouter'
@@ -2909,32 +4121,26 @@ async def execute_llm_request(config: Dict[str, Any], input_data: Any) -> Dict[s
         api_key_name = config.get('api_key_name', 'OPENROUTER_API_KEY')
         base_url = config.get('base_url') or ''
         ollama_host = config.get('ollama_host', os.getenv('OLLAMA_HOST', 'http://localhost:11434'))
+        # temperature 0 responses are reused unless the node sets cache: false
+        use_cache = config.get('cache') is not False
         
         # First, replace placeholders in user_prompt template (like {query}, {context}, etc.)
         # This is similar to how HTTP node handles placeholders
-        processed_user = user_prompt
-        if isinstance(input_data, dict):
-            import re
-            for key, value in input_data.items():
-                # Replace {key} placeholders in the prompt
-                placeholder = f'{{{key}}}'
-                if placeholder in processed_user:
-                    # Convert value to string, but handle long strings gracefully
-                    if isinstance(value, str) and len(value) > 5000:
-                        # For very long strings (like context), truncate with ellipsis
-                        processed_user = processed_user.replace(placeholder, value[:5000] + '...')
-                    else:
-                        processed_user = processed_user.replace(placeholder, str(value))
+        # Convert values to strings, but truncate very long strings (like context) with an ellipsis
+        processed_user = _render(
+            user_prompt,
+            input_data,
+            lambda value: value[:5000] + '...' if isinstance(value, str) and len(value) > 5000 else str(value)
+        )
         
         # Only append remaining input_data as JSON if there are placeholders that weren't replaced
         # and if the prompt doesn't already contain the data we need
         # Check if prompt still has unreplaced placeholders
-        unreplaced_placeholders = re.findall(r'\{(\w+)\}', processed_user)
-        if unreplaced_placeholders and input_data is not None and input_data != {}:
+        if _UNREPLACED_PLACEHOLDER_RE.search(processed_user) and input_data is not None and input_data != {}:
             # If there are unreplaced placeholders, append the data as JSON for reference
             # But only if it's not too large (to avoid token limit issues)
             try:
-                upstream_str = json.dumps(input_data, ensure_ascii=False)
+                upstream_str = _json_dumps(input_data).decode('utf-8')
                 # Limit the appended JSON to avoid token limit issues
                 if len(upstream_str) > 2000:
                     upstream_str = upstream_str[:2000] + '... (truncated)'
@@ -2946,8 +4152,32 @@ async def execute_llm_request(config: Dict[str, Any], input_data: Any) -> Dict[s
                 processed_user = f"{processed_user}\n\nAdditional data:\n{upstream_str}"
         
         processed_system = system_prompt
+        # Preview of the final prompt shown in the node output, built once for either provider
+        prompt_preview = processed_user if len(processed_user) <= 200 else f'{processed_user[:200]}...'
         
-        start_time = time.time()
+        start_time = time.perf_counter()
+        
+        semantic_namespace = semantic_vector = None
+        if config.get('semantic_cache'):
+            # Only prompts sent to the same model with the same settings can share a response
+            semantic_namespace = (provider, base_url or ollama_host, model, processed_system, max_tokens, temperature)
+            try:
+                semantic_vector = await asyncio.to_thread(LLM_SEMANTIC_CACHE.embed, processed_user)
+            except Exception as e:
+                logger.warning("Semantic cache disabled for this request: %s", e)
+            if semantic_vector is not None:
+                hit = LLM_SEMANTIC_CACHE.lookup(
+                    semantic_namespace, semantic_vector, float(config.get('semantic_threshold', 0.95))
+                )
+                if hit is not None:
+                    output, similarity = hit
+                    return {
+                        'status': 'success',
+                        'output': {**output, 'prompt': prompt_preview, 'cached': True, 'semantic_similarity': similarity},
+                        'stdout': f"LLM response from {model} via {provider} (semantic cache, similarity {similarity:.3f})",
+                        'stderr': '',
+                        'execution_time': time.perf_counter() - start_time
+                    }
         
         # OpenAI-style chat completion providers
         if provider in ('openrouter', 'openai', 'groq', 'together', 'fireworks', 'deepinfra', 'perplexity', 'mistral'):
@@ -2957,10 +4187,7 @@ async def execute_llm_request(config: Dict[str, Any], input_data: Any) -> Dict[s
                 if not api_key:
                     raise ValueError(f"API key '{api_key_name}' not found in environment variables")
                 chat_url = 'https://openrouter.ai/api/v1/chat/completions'
-                extra_headers = {
-                    'HTTP-Referer': 'http://localhost:3000',
-                    'X-Title': 'Workflow Builder'
-                }
+                extra_headers = _OPENROUTER_HEADERS
             else:
                 # For other providers we currently require a per-node API key.
                 api_key = api_key_override
@@ -2971,21 +4198,12 @@ async def execute_llm_request(config: Dict[str, Any], input_data: Any) -> Dict[s
                 if base_url:
                     url = base_url.rstrip('/') + '/chat/completions'
                 else:
-                    provider_chat_endpoints = {
-                        'openai': 'https://api.openai.com/v1/chat/completions',
-                        'groq': 'https://api.groq.com/openai/v1/chat/completions',
-                        'together': 'https://api.together.xyz/v1/chat/completions',
-                        'fireworks': 'https://api.fireworks.ai/inference/v1/chat/completions',
-                        'deepinfra': 'https://api.deepinfra.com/v1/openai/chat/completions',
-                        'perplexity': 'https://api.perplexity.ai/openai/v1/chat/completions',
-                        'mistral': 'https://api.mistral.ai/v1/chat/completions',
-                    }
-                    url = provider_chat_endpoints.get(provider)
+                    url = _PROVIDER_CHAT_ENDPOINTS.get(provider)
                     if not url:
                         raise ValueError(f"Chat completions endpoint not configured for provider '{provider}'")
 
                 chat_url = url
-                extra_headers = {}
+                extra_headers = _NO_HEADERS
 
             headers = {
                 'Authorization': f'Bearer {api_key}',
@@ -2999,61 +4217,82 @@ async def execute_llm_request(config: Dict[str, Any], input_data: Any) -> Dict[s
                     {'role': 'user', 'content': processed_user}
                 ],
                 'temperature': temperature,
-                'max_tokens': max_tokens
+                'max_tokens': max_tokens,
+                # Stream so long generations keep the connection active and tokens are read as they arrive
+                'stream': True
             }
+            if provider == 'openai':
+                # OpenAI only reports token usage on a stream when asked for it
+                payload['stream_options'] = {'include_usage': True}
             
             if processed_system:
                 payload['messages'].insert(0, {'role': 'system', 'content': processed_system})
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
+            cache_key = None
+            response_data = None
+            if temperature == 0 and use_cache:
+                cache_key = LLM_CACHE.make_key(
+                    url=chat_url, model=model, messages=payload['messages'], max_tokens=max_tokens
+                )
+                response_data = LLM_CACHE.get(cache_key)
+            cached = response_data is not None
+            
+            if not cached:
+                session = get_http_session()
+                async with LLM_SEMAPHORE, session.post(
                     chat_url,
                     headers=headers,
                     json=payload,
-                    timeout=aiohttp.ClientTimeout(total=60)
+                    timeout=_LLM_CHAT_TIMEOUT
                 ) as response:
-                    response_data = await response.json()
-                    
+                    # Check the status first so error pages that aren't JSON still report cleanly
                     if response.status != 200:
-                        raise Exception(f"{provider} API error: {response.status} - {response_data.get('error', 'Unknown error')}")
-                    
-                    if 'choices' not in response_data or not response_data['choices']:
-                        raise Exception("No response from LLM")
-                    
-                    content = response_data['choices'][0]['message']['content']
-                    
-                    execution_time = time.time() - start_time
+                        raise Exception(f"{provider} API error: {response.status} - {await _response_error_detail(response)}")
                     
-                    return {
-                        'status': 'success',
-                        'output': {
-                            'content': content,
-                            'model': model,
-                            'provider': provider,
-                            'prompt': processed_user[:200] + '...' if len(processed_user) > 200 else processed_user,
-                            'tokens_used': response_data.get('usage', {}).get('total_tokens', 0),
-                            'finish_reason': response_data['choices'][0].get('finish_reason', 'unknown')
-                        },
-                        'stdout': f"LLM response from {model} via {provider} ({len(content)} chars)",
-                        'stderr': '',
-                        'execution_time': execution_time
-                    }
+                    if response.content_type == 'text/event-stream':
+                        response_data = await _read_chat_stream(response)
+                    else:
+                        # Provider ignored stream and answered with a single document
+                        response_data = _json_loads(await _read_http_body(response))
+                
+                if 'choices' not in response_data or not response_data['choices']:
+                    raise Exception("No response from LLM")
+                
+                if cache_key is not None:
+                    LLM_CACHE.set(cache_key, response_data)
+            
+            content = response_data['choices'][0]['message']['content']
+            
+            execution_time = time.perf_counter() - start_time
+            
+            result = {
+                'status': 'success',
+                'output': {
+                    'content': content,
+                    'model': model,
+                    'provider': provider,
+                    'prompt': prompt_preview,
+                    'tokens_used': response_data.get('usage', {}).get('total_tokens', 0),
+                    'finish_reason': response_data['choices'][0].get('finish_reason', 'unknown'),
+                    'cached': cached
+                },
+                'stdout': f"LLM response from {model} via {provider} ({len(content)} chars{', cached' if cached else ''})",
+                'stderr': '',
+                'execution_time': execution_time
+            }
         
         elif provider == 'ollama':
             # Ollama local integration
             if not is_local_network_host(ollama_host):
                 raise ValueError(f"Ollama host '{ollama_host}' is not in allowed local network ranges")
             
-            # Ensure host has proper URL format
-            if not ollama_host.startswith('http'):
-                ollama_host = f'http://{ollama_host}'
-            if not ollama_host.endswith('/'):
-                ollama_host += '/'
-                
+            ollama_host, generate_url = _ollama_endpoint(ollama_host)
+            
             payload = {
                 'model': model,
                 'prompt': processed_user,
-                'stream': False,
+                # Stream so transfer overlaps generation and frames are parsed as they arrive
+                'stream': True,
                 'options': {
                     'temperature': temperature,
                     'num_predict': max_tokens
@@ -3063,43 +4302,80 @@ async def execute_llm_request(config: Dict[str, Any], input_data: Any) -> Dict[s
             if processed_system:
                 payload['system'] = processed_system
             
-            async with aiohttp.ClientSession() as session:
-                async with session.post(
-                    f'{ollama_host}api/generate',
+            cache_key = None
+            response_data = None
+            if temperature == 0 and use_cache:
+                cache_key = LLM_CACHE.make_key(
+                    host=ollama_host, model=model, prompt=processed_user,
+                    system=processed_system, num_predict=max_tokens
+                )
+                response_data = LLM_CACHE.get(cache_key)
+            cached = response_data is not None
+            
+            if not cached:
+                session = get_http_session()
+                async with LLM_SEMAPHORE, session.post(
+                    generate_url,
                     json=payload,
-                    timeout=aiohttp.ClientTimeout(total=120)
+                    timeout=_OLLAMA_TIMEOUT
                 ) as response:
-                    response_data = await response.json()
-                    
                     if response.status != 200:
-                        raise Exception(f"Ollama API error: {response.status} - {response_data.get('error', 'Unknown error')}")
+                        # Errors come back as a single document rather than a stream
+                        raise Exception(f"Ollama API error: {response.status} - {await _response_error_detail(response)}")
                     
-                    if 'response' not in response_data:
-                        raise Exception("No response from Ollama")
-                    
-                    content = response_data['response']
-                    
-                    execution_time = time.time() - start_time
-                    
-                    return {
-                        'status': 'success',
-                        'output': {
-                            'content': content,
-                            'model': model,
-                            'provider': 'ollama',
-                            'host': ollama_host,
-                            'prompt': processed_user[:200] + '...' if len(processed_user) > 200 else processed_user,
-                            'eval_count': response_data.get('eval_count', 0),
-                            'eval_duration': response_data.get('eval_duration', 0)
-                        },
-                        'stdout': f"LLM response from {model} via Ollama ({len(content)} chars)",
-                        'stderr': '',
-                        'execution_time': execution_time
-                    }
+                    response_data = await _read_ollama_stream(response)
+                
+                if 'response' not in response_data:
+                    raise Exception("No response from Ollama")
+                
+                if cache_key is not None:
+                    LLM_CACHE.set(cache_key, response_data)
+            
+            content = response_data['response']
+            
+            execution_time = time.perf_counter() - start_time
+            
+            result = {
+                'status': 'success',
+                'output': {
+                    'content': content,
+                    'model': model,
+                    'provider': 'ollama',
+                    'host': ollama_host,
+                    'prompt': prompt_preview,
+                    'eval_count': response_data.get('eval_count', 0),
+                    'eval_duration': response_data.get('eval_duration', 0),
+                    'cached': cached
+                },
+                'stdout': f"LLM response from {model} via Ollama ({len(content)} chars{', cached' if cached else ''})",
+                'stderr': '',
+                'execution_time': execution_time
+            }
         
         else:
             raise ValueError(f"Unsupported LLM provider: {provider}")
+        
+        if semantic_vector is not None and not result['output']['cached']:
+            # Outputs hold only scalars, so a shallow copy keeps downstream edits out of the cache
+            LLM_SEMANTIC_CACHE.add(semantic_namespace, semantic_vector, dict(result['output']))
+        return result
             
+    except asyncio.TimeoutError:
+        return {
+            'status': 'error',
+            'error': 'LLM request failed: timed out waiting for the provider',
+            'output': None,
+            'stdout': '',
+            'stderr': 'Request timed out'
+        }
+    except aiohttp.ClientError as e:
+        return {
+            'status': 'error',
+            'error': f'LLM request failed: could not reach provider ({type(e).__name__}: {e})',
+            'output': None,
+            'stdout': '',
+            'stderr': str(e)
+        }
     except Exception as e:
         return {
             'status': 'error',
@@ -3109,42 +4385,52 @@ async def execute_llm_request(config: Dict[str, Any], input_data: Any) -> Dict[s
             'stderr': str(e)
         }
 
-def find_downstream_nodes(foreach_node_id: str, nodes_data: dict, connections_data: dict) -> List[str]:
+def _index_connections(connections_data: dict) -> tuple:
+    """Map each node to its source and target nodes in one pass over the connections"""
+    incoming: Dict[str, List[str]] = {}
+    outgoing: Dict[str, List[str]] = {}
+    for conn_data in connections_data.values():
+        source_id = conn_data.get('source')
+        target_id = conn_data.get('target')
+        incoming.setdefault(target_id, []).append(source_id)
+        outgoing.setdefault(source_id, []).append(target_id)
+    return incoming, outgoing
+
+def find_downstream_nodes(foreach_node_id: str, nodes_data: dict, outgoing: dict) -> List[str]:
     """Find all nodes downstream from a foreach node until 'endloop' node (supports nested loops)"""
     downstream = []
     visited = set()
-    queue = [foreach_node_id]
+    # deque so each dequeue is O(1) instead of list.pop(0)'s shift
+    to_visit = deque([foreach_node_id])
     endloop_node_id = None
     
-    while queue:
-        current_id = queue.pop(0)
+    while to_visit:
+        current_id = to_visit.popleft()
         if current_id in visited:
             continue
         visited.add(current_id)
         
         # Find all nodes connected from this node
-        for conn_id, conn_data in connections_data.items():
-            if conn_data.get('source') == current_id:
-                target_id = conn_data.get('target')
-                if target_id and target_id not in visited:
-                    target_node = nodes_data.get(target_id, {})
-                    target_type = target_node.get('type', '')
-                    
-                    # Stop at 'endloop' node (marks end of this foreach loop)
-                    if target_type == 'endloop':
-                        endloop_node_id = target_id
-                        continue
-                    
-                    # Stop at 'end' node (workflow termination)
-                    if target_type == 'end':
-                        continue
-                    
-                    # For nested loops: stop at another 'foreach' node (it will have its own endloop)
-                    if target_type == 'foreach':
-                        continue
-                    
-                    downstream.append(target_id)
-                    queue.append(target_id)
+        for target_id in outgoing.get(current_id, ()):
+            if target_id and target_id not in visited:
+                target_node = nodes_data.get(target_id, {})
+                target_type = target_node.get('type', '')
+                
+                # Stop at 'endloop' node (marks end of this foreach loop)
+                if target_type == 'endloop':
+                    endloop_node_id = target_id
+                    continue
+                
+                # Stop at 'end' node (workflow termination)
+                if target_type == 'end':
+                    continue
+                
+                # For nested loops: stop at another 'foreach' node (it will have its own endloop)
+                if target_type == 'foreach':
+                    continue
+                
+                downstream.append(target_id)
+                to_visit.append(target_id)
     
     # Include the endloop node in the downstream list if found
     if endloop_node_id:
@@ -3156,7 +4442,7 @@ def find_downstream_nodes(foreach_node_id: str, nodes_data: dict, connections_da
 async def execute_sub_workflow(
     node_ids: List[str],
     nodes_data: dict,
-    connections_data: dict,
+    incoming: dict,
     starting_input: Any,
     node_outputs_ref: dict
 ) -> Dict[str, Any]:
@@ -3174,12 +4460,10 @@ async def execute_sub_workflow(
         
         # Find input for this node (from local outputs or starting input)
         input_data = current_input
-        for conn_id, conn_data in connections_data.items():
-            if conn_data.get('target') == node_id:
-                source_id = conn_data.get('source')
-                if source_id in local_outputs:
-                    input_data = local_outputs[source_id]
-                    break
+        for source_id in incoming.get(node_id, ()):
+            if source_id in local_outputs:
+                input_data = local_outputs[source_id]
+                break
         
         # Check if node should be skipped
         if skip_during_execution:
@@ -3202,50 +4486,13 @@ async def execute_sub_workflow(
             continue
         
         # Execute the node
-        node_start_time = time.time()
+        node_start_time = time.perf_counter()
         try:
-            if node_type == 'python':
-                code = node_data.get('code', 'def run(input):\n    return input')
-                result = execute_python_code(code, input_data)
-            elif node_type == 'typescript':
-                code = node_data.get('code', 'async function run(input: any): Promise<any> {\n    return input;\n}')
-                result = await execute_typescript_code(code, input_data)
-            elif node_type == 'http':
-                config = node_data.get('config', {})
-                result = await execute_http_request(config, input_data)
-            elif node_type == 'file':
-                config = node_data.get('config', {})
-                result = await execute_file_operation(config, input_data)
-            elif node_type == 'condition':
-                config = node_data.get('config', {})
-                result = await execute_conditional_logic(config, input_data)
-            elif node_type == 'database':
-                config = node_data.get('config', {})
-                result = await execute_database_query(config, input_data)
-            elif node_type == 'llm':
-                config = node_data.get('config', {})
-                result = await execute_llm_request(config, input_data)
-            elif node_type == 'markdown':
-                config = node_data.get('config', {})
-                result = await execute_markdown_viewer(config, input_data)
-            elif node_type == 'html':
-                config = node_data.get('config', {})
-                result = await execute_html_viewer(config, input_data)
-            elif node_type == 'json':
-                config = node_data.get('config', {})
-                result = await execute_json_viewer(config, input_data)
-            elif node_type == 'image':
-                config = node_data.get('config', {})
-                result = await execute_image_viewer(config, input_data)
-            elif node_type == 'ocr':
-                config = node_data.get('config', {})
-                result = await execute_ocr_node(config, input_data)
+            if node_type in NODE_DISPATCH:
+                result = await NODE_DISPATCH[node_type](node_data, input_data)
             elif node_type == 'browser':
                 config = node_data.get('config', {})
                 result = await execute_browser_node(config, input_data, node_outputs_ref)
-            elif node_type == 'embedding':
-                config = node_data.get('config', {})
-                result = await execute_embedding_node(config, input_data)
             elif node_type == 'endloop':
                 # EndLoop node: just passes through the input (aggregation happens in ForEach)
                 # This node exists to mark the end of a ForEach sub-workflow
@@ -3263,7 +4510,7 @@ async def execute_sub_workflow(
                     'output': None
                 }
             
-            node_execution_time = time.time() - node_start_time
+            node_execution_time = time.perf_counter() - node_start_time
             
             # Track this node's execution
             node_executions.append({
@@ -3304,7 +4551,7 @@ async def execute_sub_workflow(
             current_input = output
             
         except Exception as e:
-            node_execution_time = time.time() - node_start_time
+            node_execution_time = time.perf_counter() - node_start_time
             node_executions.append({
                 'node_id': node_id,
                 'node_title': node_title,
@@ -3350,40 +4597,48 @@ async def execute_foreach_loop(
     input_data: Any,
     foreach_node_id: str,
     nodes_data: dict,
-    connections_data: dict
+    incoming: dict,
+    downstream_node_ids: List[str]
 ) -> Dict[str, Any]:
-    """Execute a foreach loop node"""
-    start_time = time.time()
+    """Execute a foreach loop node over the downstream nodes run_workflow found for it"""
+    start_time = time.perf_counter()
     
-    # Debug logging
-    print(f"ForEach loop - input_data type: {type(input_data)}")
-    print(f"ForEach loop - input_data: {json.dumps(input_data, indent=2) if isinstance(input_data, (dict, list)) else str(input_data)[:200]}")
+    # Serializing the input is expensive, so only do it when debug output is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("ForEach loop - input_data type: %s", type(input_data))
+        logger.debug(
+            "ForEach loop - input_data: %s",
+            _json_pretty(input_data) if isinstance(input_data, (dict, list)) else str(input_data)[:200]
+        )
     
     # Extract array to iterate over
     items = []
     items_key = config.get('items_key', 'items')
-    print(f"ForEach loop - items_key: {items_key}")
+    logger.debug("ForEach loop - items_key: %s", items_key)
     
     # Check if input_data is an array
     if isinstance(input_data, list):
         items = input_data
-        print(f"ForEach loop - input_data is a list, using directly: {len(items)} items")
+        logger.debug("ForEach loop - input_data is a list, using directly: %d items", len(items))
     # Check if input_data has the specified key
     elif isinstance(input_data, dict) and items_key in input_data:
         items_value = input_data[items_key]
-        print(f"ForEach loop - found items_key '{items_key}' in input_data, value type: {type(items_value)}")
+        logger.debug("ForEach loop - found items_key '%s' in input_data, value type: %s", items_key, type(items_value))
         if isinstance(items_value, list):
             items = items_value
-            print(f"ForEach loop - extracted {len(items)} items from input_data['{items_key}']")
+            logger.debug("ForEach loop - extracted %d items from input_data['%s']", len(items), items_key)
         else:
-            print(f"ForEach loop - items_key '{items_key}' exists but is not a list: {type(items_value)}")
+            logger.debug("ForEach loop - items_key '%s' exists but is not a list: %s", items_key, type(items_value))
     else:
-        print(f"ForEach loop - items_key '{items_key}' not found in input_data. Available keys: {list(input_data.keys()) if isinstance(input_data, dict) else 'N/A'}")
+        logger.debug(
+            "ForEach loop - items_key '%s' not found in input_data. Available keys: %s",
+            items_key, list(input_data.keys()) if isinstance(input_data, dict) else 'N/A'
+        )
     
     # Fall back to config items
     if not items:
         items = config.get('items', [])
-        print(f"ForEach loop - using fallback config items: {len(items)} items")
+        logger.debug("ForEach loop - using fallback config items: %d items", len(items))
     
     if not isinstance(items, list):
         return {
@@ -3392,7 +4647,7 @@ async def execute_foreach_loop(
             'output': None,
             'stdout': '',
             'stderr': '',
-            'execution_time': time.time() - start_time
+            'execution_time': time.perf_counter() - start_time
         }
     
     if not items:
@@ -3406,12 +4661,9 @@ async def execute_foreach_loop(
             },
             'stdout': 'ForEach loop executed with empty array',
             'stderr': '',
-            'execution_time': time.time() - start_time
+            'execution_time': time.perf_counter() - start_time
         }
     
-    # Find downstream nodes (includes EndLoop if present)
-    downstream_node_ids = find_downstream_nodes(foreach_node_id, nodes_data, connections_data)
-    
     # Find the EndLoop node in downstream nodes
     endloop_node_id = None
     sub_workflow_node_ids = []
@@ -3433,12 +4685,12 @@ async def execute_foreach_loop(
             },
             'stdout': 'ForEach loop executed with no downstream nodes',
             'stderr': '',
-            'execution_time': time.time() - start_time
+            'execution_time': time.perf_counter() - start_time
         }
     
     # Warn if no EndLoop found
     if not endloop_node_id:
-        print(f"WARNING: ForEach node {foreach_node_id} has no EndLoop node. Results will be aggregated but may not flow correctly.")
+        logger.warning("ForEach node %s has no EndLoop node. Results will be aggregated but may not flow correctly.", foreach_node_id)
     
     # Execute iterations
     execution_mode = config.get('execution_mode', 'serial')
@@ -3464,7 +4716,7 @@ async def execute_foreach_loop(
             result = await execute_sub_workflow(
                 nodes_to_execute,
                 nodes_data,
-                connections_data,
+                incoming,
                 iteration_input,  # Item as primary, but context available via _workflow_context
                 {}
             )
@@ -3490,29 +4742,24 @@ async def execute_foreach_loop(
     if execution_mode == 'parallel':
         # Parallel execution with concurrency limit
         max_concurrency = config.get('max_concurrency', 5)
-        semaphore = asyncio.Semaphore(max_concurrency)
-        
-        async def execute_with_semaphore(item: Any, index: int):
-            async with semaphore:
-                return await execute_iteration(item, index)
-        
-        # Execute all iterations in parallel (with concurrency limit)
-        iteration_tasks = [execute_with_semaphore(item, i) for i, item in enumerate(items)]
-        results = await asyncio.gather(*iteration_tasks, return_exceptions=True)
-        
-        # Handle exceptions
-        processed_results = []
-        for i, result in enumerate(results):
-            if isinstance(result, Exception):
-                processed_results.append({
-                    'item': items[i],
-                    'output': None,
-                    'status': 'error',
-                    'error': str(result)
-                })
-            else:
-                processed_results.append(result)
-        results = processed_results
+        results = [None] * len(items)
+        pending = iter(enumerate(items))
+        
+        async def iteration_worker():
+            # Workers share one iterator, so at most max_concurrency iterations are in flight
+            for i, item in pending:
+                try:
+                    results[i] = await execute_iteration(item, i)
+                except Exception as e:
+                    results[i] = {
+                        'item': item,
+                        'output': None,
+                        'status': 'error',
+                        'error': str(e)
+                    }
+        
+        worker_count = max(1, min(max_concurrency, len(items)))
+        await asyncio.gather(*(iteration_worker() for _ in range(worker_count)))
     else:
         # Serial execution
         for i, item in enumerate(items):
@@ -3555,7 +4802,7 @@ async def execute_foreach_loop(
         'output': foreach_output,
         'stdout': f'ForEach loop executed {len(results)} iterations ({successful} successful, {failed} failed)',
         'stderr': '',
-        'execution_time': time.time() - start_time,
+        'execution_time': time.perf_counter() - start_time,
         'endloop_node_id': endloop_node_id  # Pass EndLoop ID for main execution flow
     }
 
@@ -3605,18 +4852,210 @@ async def execute_endloop_node(input_data: Any) -> Dict[str, Any]:
         }
 
 
+# Node result cache keyed by (node_type, node spec, input), bounded LRU with a TTL
+NODE_CACHE_SIZE = int(os.getenv('NODE_CACHE_SIZE', 256))
+NODE_CACHE_TTL = float(os.getenv('NODE_CACHE_TTL', 300))
+_NODE_CACHE: "OrderedDict[bytes, tuple]" = OrderedDict()
+
+def _canonical_json(obj: Any) -> Optional[bytes]:
+    """Serialize with sorted keys so equal values hash equally, or None if not serializable"""
+    try:
+        if orjson is not None:
+            return orjson.dumps(obj, default=str, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS)
+        return json.dumps(obj, default=str, sort_keys=True).encode('utf-8')
+    except (TypeError, ValueError):
+        return None
+
+def _node_cache_key(node_type: str, node_data: Dict[str, Any], input_data: Any) -> Optional[bytes]:
+    """Build a cache key for a pure node execution, or None if the node must always run"""
+    config = node_data.get('config', {})
+    if node_data.get('cache') is False or config.get('cache') is False:
+        return None
+    # Code and HTTP nodes may fetch URLs, read the clock or post webhooks, so they opt in
+    opted_in = node_data.get('cache') is True or config.get('cache') is True
+    if node_type in ('python', 'typescript') and opted_in:
+        spec = node_data.get('code', '')
+    elif node_type == 'http' and opted_in and config.get('method', 'GET').upper() == 'GET':
+        spec = config
+    elif node_type == 'file' and config.get('operation', 'read') == 'read':
+        # Include the file's mtime and size so edits invalidate the entry
+        try:
+            stat = os.stat(_workflow_file_path(config.get('path', '')))
+        except OSError:
+            return None
+        spec = [config, stat.st_mtime_ns, stat.st_size]
+    else:
+        return None
+    canonical_spec = _canonical_json(spec)
+    canonical_input = _canonical_json(input_data)
+    if canonical_spec is None or canonical_input is None:
+        return None
+    return hashlib.blake2b(
+        node_type.encode() + b'\0' + canonical_spec + b'\0' + canonical_input,
+        digest_size=16
+    ).digest()
+
+def _get_cached_node_result(key: bytes) -> Optional[Dict[str, Any]]:
+    """Return a cached node result, or None on miss or expiry"""
+    entry = _NODE_CACHE.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() - entry[0] > NODE_CACHE_TTL:
+        del _NODE_CACHE[key]
+        return None
+    _NODE_CACHE.move_to_end(key)
+    # Read-only contract: every hit shares the snapshot taken when the result was stored,
+    # and only the envelope is copied to reset execution_time. Executors must never mutate
+    # their input_data in place (copy before annotating, as the viewer nodes do), or the
+    # change leaks into this entry and every later hit
+    return {**entry[1], 'execution_time': 0.0}
+
+def _store_cached_node_result(key: bytes, result: Dict[str, Any]):
+    """Cache a snapshot of a successful node result"""
+    if result.get('status') != 'success':
+        return
+    _NODE_CACHE[key] = (time.monotonic(), copy.deepcopy(result))
+    _NODE_CACHE.move_to_end(key)
+    while len(_NODE_CACHE) > NODE_CACHE_SIZE:
+        _NODE_CACHE.popitem(last=False)
+
+# Whole-workflow results, so re-running an unchanged side-effect-free workflow is a lookup
+WORKFLOW_CACHE_SIZE = int(os.getenv('WORKFLOW_CACHE_SIZE', 128))
+WORKFLOW_CACHE_TTL = float(os.getenv('WORKFLOW_CACHE_TTL', NODE_CACHE_TTL))
+_WORKFLOW_CACHE: "OrderedDict[bytes, tuple]" = OrderedDict()
+
+# Node types whose output depends only on their own spec and input. Code nodes can
+# make network calls or read the clock, so like other side-effecting nodes they need cacheable: true
+_PURE_NODE_TYPES = frozenset({
+    'start', 'end', 'condition', 'foreach', 'endloop',
+    'markdown', 'html', 'json',
+})
+
+def _is_pure_node(node_data: Dict[str, Any]) -> bool:
+    """Whether a node can be replayed from cache; side-effecting nodes must opt in with cacheable: true"""
+    config = node_data.get('config', {})
+    if node_data.get('cache') is False or config.get('cache') is False:
+        return False
+    node_type = node_data.get('type')
+    if node_type in _PURE_NODE_TYPES:
+        return True
+    if node_type == 'llm':
+        try:
+            return float(config.get('temperature', 0.7)) == 0
+        except (TypeError, ValueError):
+            return False
+    return node_data.get('cacheable') is True or config.get('cacheable') is True
+
+def _workflow_cache_key(workflow: Dict[str, Any]) -> Optional[bytes]:
+    """Build a cache key for a workflow made only of pure nodes, or None if it must run"""
+    nodes = workflow.get('nodes', {})
+    if not nodes or not all(_is_pure_node(node_data) for node_data in nodes.values()):
+        return None
+    canonical = _canonical_json(workflow)
+    if canonical is None:
+        return None
+    return hashlib.sha256(canonical).digest()
+
+def _get_cached_workflow_result(key: bytes) -> Optional[Dict[str, Any]]:
+    """Return a cached workflow result, or None on miss or expiry"""
+    entry = _WORKFLOW_CACHE.get(key)
+    if entry is None:
+        return None
+    if time.monotonic() - entry[0] > WORKFLOW_CACHE_TTL:
+        del _WORKFLOW_CACHE[key]
+        return None
+    _WORKFLOW_CACHE.move_to_end(key)
+    return entry[1]
+
+def _store_cached_workflow_result(key: bytes, result: Dict[str, Any]):
+    """Cache a successful workflow result"""
+    if result.get('status') != 'success':
+        return
+    _WORKFLOW_CACHE[key] = (time.monotonic(), result)
+    _WORKFLOW_CACHE.move_to_end(key)
+    while len(_WORKFLOW_CACHE) > WORKFLOW_CACHE_SIZE:
+        _WORKFLOW_CACHE.popitem(last=False)
+
+async def _run_start_node(node_data: dict, input_data: Any) -> Dict[str, Any]:
+    return {
+        'status': 'success',
+        'output': {'message': 'Workflow started'},
+        'stdout': 'Start node executed successfully',
+        'stderr': '',
+        'execution_time': 0.0
+    }
+
+async def _run_end_node(node_data: dict, input_data: Any) -> Dict[str, Any]:
+    return {
+        'status': 'success',
+        'output': input_data,
+        'stdout': 'End node executed successfully',
+        'stderr': '',
+        'execution_time': 0.0
+    }
+
+async def _run_python_node(node_data: dict, input_data: Any) -> Dict[str, Any]:
+    code = node_data.get('code', 'def run(input):\n    return input')
+    logger.debug("Executing Python code:\n%s", code)
+    return await execute_python_code(code, input_data)
+
+async def _run_typescript_node(node_data: dict, input_data: Any) -> Dict[str, Any]:
+    code = node_data.get('code', 'async function run(input: any): Promise<any> {\n    return input;\n}')
+    logger.debug("Executing TypeScript code:\n%s", code)
+    return await execute_typescript_code(code, input_data)
+
+def _config_node(executor: Callable) -> Callable:
+    """Adapt an executor taking (config, input_data) to the dispatch signature"""
+    async def run(node_data: dict, input_data: Any) -> Dict[str, Any]:
+        return await executor(node_data.get('config', {}), input_data)
+    return run
+
+# Executors for node types that only need their own node data and input, keyed by node type.
+# foreach, endloop and browser nodes depend on workflow state and are handled by the callers.
+NODE_DISPATCH: Dict[str, Callable] = {
+    'start': _run_start_node,
+    'end': _run_end_node,
+    'python': _run_python_node,
+    'typescript': _run_typescript_node,
+    'http': _config_node(execute_http_request),
+    'file': _config_node(execute_file_operation),
+    'condition': _config_node(execute_conditional_logic),
+    'database': _config_node(execute_database_query),
+    'llm': _config_node(execute_llm_request),
+    'markdown': _config_node(execute_markdown_viewer),
+    'html': _config_node(execute_html_viewer),
+    'json': _config_node(execute_json_viewer),
+    'image': _config_node(execute_image_viewer),
+    'ocr': _config_node(execute_ocr_node),
+    'embedding': _config_node(execute_embedding_node),
+}
+
+# Maximum number of workflow nodes executing at the same time
+WORKFLOW_MAX_CONCURRENCY = int(os.getenv('WORKFLOW_MAX_CONCURRENCY', 8))
+
 @app.post("/run")
-async def run_workflow(request: dict):
-    """Execute a workflow"""
-    print("=== WORKFLOW EXECUTION START ===")
-    print(f"Received request: {json.dumps(request, indent=2)}")
+async def run_workflow(request: dict, x_no_cache: Optional[str] = Header(None)):
+    """Execute a workflow; send an X-No-Cache header to bypass cached results"""
+    workflow_start_time = time.perf_counter()
+    logger.info("Workflow execution start")
+    # Serializing the whole request is expensive, so only do it when debug output is on
+    if logger.isEnabledFor(logging.DEBUG):
+        logger.debug("Received request: %s", _json_pretty(request))
     
     try:
         workflow = request.get('workflow', {})
         nodes_data = workflow.get('nodes', {})
         connections_data = workflow.get('connections', {})
         
-        print(f"Processing {len(nodes_data)} nodes and {len(connections_data)} connections")
+        # An unchanged workflow of pure nodes returns its previous result without running
+        workflow_cache_key = None if x_no_cache else _workflow_cache_key(workflow)
+        if workflow_cache_key is not None:
+            cached_workflow = _get_cached_workflow_result(workflow_cache_key)
+            if cached_workflow is not None:
+                logger.info("Using cached result for unchanged workflow")
+                return {**cached_workflow, 'total_time': time.perf_counter() - workflow_start_time}
+        
+        logger.debug("Processing %d nodes and %d connections", len(nodes_data), len(connections_data))
         
         # Topological sort to execute nodes in dependency order
         def topological_sort_nodes(nodes_data: dict, connections_data: dict) -> List[str]:
@@ -3634,97 +5073,111 @@ async def run_workflow(request: dict):
                     in_degree[target_id] += 1
             
             # Find nodes with no incoming edges (can execute first)
-            queue = [node_id for node_id, degree in in_degree.items() if degree == 0]
+            ready = deque(node_id for node_id, degree in in_degree.items() if degree == 0)
             result = []
             
-            while queue:
-                node_id = queue.pop(0)
+            while ready:
+                node_id = ready.popleft()
                 result.append(node_id)
                 
                 # Remove this node and update in-degrees of its targets
                 for target_id in graph[node_id]:
                     in_degree[target_id] -= 1
                     if in_degree[target_id] == 0:
-                        queue.append(target_id)
+                        ready.append(target_id)
             
             # If we didn't process all nodes, there might be cycles (or isolated nodes)
             # Add any remaining nodes (they might be isolated or part of cycles)
             remaining = set(nodes_data.keys()) - set(result)
             if remaining:
-                print(f"Warning: {len(remaining)} nodes not in dependency graph (isolated or cycles): {remaining}")
+                logger.warning("%d nodes not in dependency graph (isolated or cycles): %s", len(remaining), remaining)
                 result.extend(remaining)
             
             return result
         
+        # Source and target nodes per node, indexed once instead of scanning every connection per node
+        incoming, outgoing = _index_connections(connections_data)
+        
         # Get execution order using topological sort
         execution_order = topological_sort_nodes(nodes_data, connections_data)
-        print(f"Execution order (topological sort): {execution_order}")
+        logger.debug("Execution order (topological sort): %s", execution_order)
         
-        node_results = []
         node_outputs = {}
         
-        # Track nodes that are downstream from foreach nodes (they execute inside the foreach)
-        nodes_to_skip = set()
+        # Nodes downstream of each foreach (including its EndLoop), found once and reused when
+        # the loop runs; they execute inside the foreach rather than as top-level nodes
+        downstream_of_foreach = {}
         for node_id, node_data in nodes_data.items():
             if node_data.get('type') == 'foreach':
-                downstream = find_downstream_nodes(node_id, nodes_data, connections_data)
-                nodes_to_skip.update(downstream)
-                print(f"ForEach node {node_id} has downstream nodes: {downstream}")
-        
-        # Execute nodes in topological order
-        for node_id in execution_order:
-            if node_id not in nodes_data:
-                continue
+                downstream_of_foreach[node_id] = find_downstream_nodes(node_id, nodes_data, outgoing)
+                logger.debug("ForEach node %s has downstream nodes: %s", node_id, downstream_of_foreach[node_id])
+        nodes_to_skip = set().union(*downstream_of_foreach.values())
+        
+        # Dependency-driven scheduling: each node waits only for its upstream nodes, so
+        # independent branches run concurrently. Only parents earlier in the topological order
+        # count, which keeps nodes in cycles running after everything before them.
+        position = {node_id: index for index, node_id in enumerate(execution_order)}
+        parents = {node_id: [] for node_id in execution_order}
+        for target_id, source_ids in incoming.items():
+            if target_id in position:
+                for source_id in source_ids:
+                    if source_id in position and position[source_id] < position[target_id]:
+                        parents[target_id].append(source_id)
+        
+        results_by_id = {}
+        node_tasks = {}
+        node_slots = asyncio.Semaphore(WORKFLOW_MAX_CONCURRENCY)
+        
+        async def execute_node(node_id: str) -> bool:
+            """Execute one node with the outputs of its finished upstream nodes, returning False on error"""
             node_data = nodes_data[node_id]
-            # Skip nodes that are downstream from foreach (they execute inside the foreach)
-            if node_id in nodes_to_skip:
-                print(f"Skipping node {node_id} (executes inside foreach loop)")
-                continue
-                
-            print(f"\n--- Executing node {node_id} ---")
+            logger.debug("Executing node %s", node_id)
             node_type = node_data.get('type', 'unknown')
-            print(f"Node type: {node_type}")
+            logger.debug("Node type: %s", node_type)
             
-            # Find input for this node
-            input_data = {}
-            # Check all connections to find the source for this node
-            # Collect all potential sources
+            # Find input for this node from its indexed incoming connections
+            input_data = None
             potential_sources = []
-            for conn_id, conn_data in connections_data.items():
-                target_id = conn_data.get('target')
-                if target_id == node_id:
-                    source_id = conn_data.get('source')
-                    if source_id in node_outputs:
-                        potential_sources.append((source_id, node_outputs[source_id]))
-                        print(f"Found connection: {source_id} -> {node_id}")
+            for source_id in incoming.get(node_id, ()):
+                if source_id in node_outputs:
+                    potential_sources.append((source_id, node_outputs[source_id]))
+                    logger.debug("Found connection: %s -> %s", source_id, node_id)
             
             # If multiple sources, prefer the one that makes sense for the node type
             if len(potential_sources) > 1:
-                print(f"Multiple connections to {node_id}, evaluating which to use...")
+                logger.debug("Multiple connections to %s, evaluating which to use", node_id)
                 # For foreach nodes, prefer sources that have 'items' key
                 if node_type == 'foreach':
                     for source_id, source_output in potential_sources:
                         if isinstance(source_output, dict) and 'items' in source_output:
                             input_data = source_output
-                            print(f"Using input from {source_id} for {node_id} (has 'items' key)")
+                            logger.debug("Using input from %s for %s (has 'items' key)", source_id, node_id)
                             break
-                    # If no source has 'items', use the first one
-                    if not input_data:
+                    else:
+                        # If no source has 'items', use the first one
                         source_id, input_data = potential_sources[0]
-                        print(f"Using first available input from {source_id} for {node_id}")
+                        logger.debug("Using first available input from %s for %s", source_id, node_id)
+                elif all(isinstance(source_output, dict) for _, source_output in potential_sources):
+                    # Merge dict outputs so fan-in nodes see every upstream value;
+                    # earlier connections win when keys collide
+                    input_data = {}
+                    for source_id, source_output in reversed(potential_sources):
+                        input_data.update(source_output)
+                    logger.debug("Merged inputs from %s for %s", [source_id for source_id, _ in potential_sources], node_id)
                 else:
-                    # For other nodes, use the first available source
+                    # Non-dict outputs can't be merged - use the first available source
                     source_id, input_data = potential_sources[0]
-                    print(f"Using input from {source_id} for {node_id}")
+                    logger.debug("Using input from %s for %s", source_id, node_id)
             elif len(potential_sources) == 1:
                 source_id, input_data = potential_sources[0]
-                print(f"Using input from {source_id} for {node_id}")
-                print(f"Input data type: {type(input_data)}, keys: {list(input_data.keys()) if isinstance(input_data, dict) else 'N/A'}")
+                logger.debug("Using input from %s for %s", source_id, node_id)
+                logger.debug("Input data type: %s, keys: %s", type(input_data), input_data.keys() if isinstance(input_data, dict) else 'N/A')
             else:
-                print(f"No connections found for {node_id}")
+                logger.debug("No connections found for %s", node_id)
             
-            if not input_data:
-                print(f"Using default empty input for {node_id}")
+            # Test for a missing input explicitly rather than truth-testing a possibly large payload
+            if input_data is None:
+                logger.debug("Using default empty input for %s", node_id)
                 input_data = {}
             
             # Check if node should be skipped
@@ -3740,7 +5193,7 @@ async def run_workflow(request: dict):
                     'execution_time': 0.0
                 }
                 node_outputs[node_id] = result['output']
-                node_results.append({
+                results_by_id[node_id] = {
                     'id': node_id,
                     'status': 'success',
                     'output': result['output'],
@@ -3748,58 +5201,21 @@ async def run_workflow(request: dict):
                     'stderr': result['stderr'],
                     'execution_time': result['execution_time'],
                     'error': None
-                })
-                print(f"Node {node_id} skipped during execution")
-                continue
+                }
+                logger.debug("Node %s skipped during execution", node_id)
+                return True
+            
+            # Reuse a previous result when the same pure node sees the same input
+            cache_key = None if x_no_cache else _node_cache_key(node_type, node_data, input_data)
+            cached_result = _get_cached_node_result(cache_key) if cache_key is not None else None
             
             # Execute the node
-            if node_type == 'start':
-                result = {
-                    'status': 'success',
-                    'output': {'message': 'Workflow started'},
-                    'stdout': 'Start node executed successfully',
-                    'stderr': '',
-                    'execution_time': 0.0
-                }
-                
-            elif node_type == 'end':
-                result = {
-                    'status': 'success',
-                    'output': input_data,
-                    'stdout': 'End node executed successfully',
-                    'stderr': '',
-                    'execution_time': 0.0
-                }
-                
-            elif node_type == 'python':
-                code = node_data.get('code', 'def run(input):\n    return input')
-                print(f"Executing Python code:\n{code}")
-                result = execute_python_code(code, input_data)
-                
-            elif node_type == 'typescript':
-                code = node_data.get('code', 'async function run(input: any): Promise<any> {\n    return input;\n}')
-                print(f"Executing TypeScript code:\n{code}")
-                result = await execute_typescript_code(code, input_data)
-                
-            elif node_type == 'http':
-                config = node_data.get('config', {})
-                result = await execute_http_request(config, input_data)
+            if cached_result is not None:
+                logger.debug("Using cached result for node %s", node_id)
+                result = cached_result
                 
-            elif node_type == 'file':
-                config = node_data.get('config', {})
-                result = await execute_file_operation(config, input_data)
-                
-            elif node_type == 'condition':
-                config = node_data.get('config', {})
-                result = await execute_conditional_logic(config, input_data)
-                
-            elif node_type == 'database':
-                config = node_data.get('config', {})
-                result = await execute_database_query(config, input_data)
-                
-            elif node_type == 'llm':
-                config = node_data.get('config', {})
-                result = await execute_llm_request(config, input_data)
+            elif node_type in NODE_DISPATCH:
+                result = await NODE_DISPATCH[node_type](node_data, input_data)
                 
             elif node_type == 'browser':
                 config = node_data.get('config', {})
@@ -3807,20 +5223,21 @@ async def run_workflow(request: dict):
                 
             elif node_type == 'foreach':
                 config = node_data.get('config', {})
-                result = await execute_foreach_loop(config, input_data, node_id, nodes_data, connections_data)
+                result = await execute_foreach_loop(
+                    config, input_data, node_id, nodes_data, incoming, downstream_of_foreach[node_id]
+                )
                 
                 # If ForEach has an EndLoop node, execute it with aggregated results
                 endloop_node_id = result.get('endloop_node_id')
                 if endloop_node_id and endloop_node_id in nodes_data:
                     # Execute EndLoop with aggregated data
                     endloop_input = result['output']  # Contains aggregated_outputs, results, etc.
-                    print(f"DEBUG: ForEach {node_id} executing EndLoop {endloop_node_id} with input keys: {list(endloop_input.keys()) if isinstance(endloop_input, dict) else 'N/A'}")
+                    logger.debug("ForEach %s executing EndLoop %s", node_id, endloop_node_id)
                     endloop_result = await execute_endloop_node(endloop_input)
                     
                     # Store EndLoop result in node_outputs so next node can access it
                     node_outputs[endloop_node_id] = endloop_result['output']
-                    print(f"DEBUG: EndLoop {endloop_node_id} output stored. Keys: {list(endloop_result['output'].keys()) if isinstance(endloop_result['output'], dict) else 'N/A'}")
-                    print(f"DEBUG: EndLoop aggregated_outputs count: {len(endloop_result['output'].get('aggregated_outputs', []))}")
+                    logger.debug("EndLoop %s output stored", endloop_node_id)
                     
                     # Update result to use EndLoop output
                     result['output'] = endloop_result['output']
@@ -3832,7 +5249,7 @@ async def run_workflow(request: dict):
                 if node_id in node_outputs:
                     # Use the already-executed result
                     stored_output = node_outputs[node_id]
-                    print(f"DEBUG: EndLoop {node_id} using stored output. Keys: {list(stored_output.keys()) if isinstance(stored_output, dict) else 'N/A'}")
+                    logger.debug("EndLoop %s using stored output", node_id)
                     result = {
                         'status': 'success',
                         'output': stored_output,
@@ -3851,30 +5268,6 @@ async def run_workflow(request: dict):
                         'execution_time': 0.0
                     }
                 
-            elif node_type == 'markdown':
-                config = node_data.get('config', {})
-                result = await execute_markdown_viewer(config, input_data)
-                
-            elif node_type == 'html':
-                config = node_data.get('config', {})
-                result = await execute_html_viewer(config, input_data)
-                
-            elif node_type == 'json':
-                config = node_data.get('config', {})
-                result = await execute_json_viewer(config, input_data)
-                
-            elif node_type == 'image':
-                config = node_data.get('config', {})
-                result = await execute_image_viewer(config, input_data)
-                
-            elif node_type == 'ocr':
-                config = node_data.get('config', {})
-                result = await execute_ocr_node(config, input_data)
-                
-            elif node_type == 'embedding':
-                config = node_data.get('config', {})
-                result = await execute_embedding_node(config, input_data)
-                
             else:
                 result = {
                     'status': 'error',
@@ -3884,6 +5277,9 @@ async def run_workflow(request: dict):
                     'stderr': ''
                 }
             
+            if cache_key is not None and cached_result is None:
+                _store_cached_node_result(cache_key, result)
+            
             # Store result
             node_result = {
                 'id': node_id,
@@ -3895,13 +5291,41 @@ async def run_workflow(request: dict):
                 'error': result.get('error')
             }
             
-            node_results.append(node_result)
+            results_by_id[node_id] = node_result
             node_outputs[node_id] = result['output']
             
-            print(f"Node {node_id} result: {result['status']}")
+            logger.debug("Node %s result: %s", node_id, result['status'])
             if result['status'] == 'error':
-                print(f"Error in {node_id}: {result.get('error')}")
-                break
+                logger.warning("Error in %s: %s", node_id, result.get('error'))
+                return False
+            return True
+        
+        async def schedule_node(node_id: str) -> bool:
+            """Wait for upstream nodes, then execute unless one of them failed"""
+            upstream_ok = await asyncio.gather(*(node_tasks[parent_id] for parent_id in parents[node_id]))
+            if not all(upstream_ok):
+                # A failed ancestor stops this branch; independent branches keep running
+                return False
+            # Skip nodes that are downstream from foreach (they execute inside the foreach)
+            if node_id in nodes_to_skip:
+                logger.debug("Skipping node %s (executes inside foreach loop)", node_id)
+                return True
+            async with node_slots:
+                return await execute_node(node_id)
+        
+        # Tasks are created in topological order, so every parent task exists before its children
+        for node_id in execution_order:
+            node_tasks[node_id] = asyncio.create_task(schedule_node(node_id))
+        try:
+            await asyncio.gather(*node_tasks.values())
+        except BaseException:
+            # Don't leave sibling nodes running after an unexpected failure
+            for task in node_tasks.values():
+                task.cancel()
+            raise
+        
+        # Report results in topological order regardless of completion order
+        node_results = [results_by_id[node_id] for node_id in execution_order if node_id in results_by_id]
         
         # Build final response
         overall_status = 'success'
@@ -3916,15 +5340,14 @@ async def run_workflow(request: dict):
         final_result = {
             'status': overall_status,
             'nodes': node_results,
-            'total_time': time.time() - time.time(),
+            'total_time': time.perf_counter() - workflow_start_time,
             'error': overall_error
         }
         
-        print(f"\n=== EXECUTION COMPLETE ===")
+        logger.info("Workflow execution complete")
         
         # Convert bytes to base64 for JSON serialization (both for printing and return)
         def convert_bytes_to_base64(obj):
-            import base64
             if isinstance(obj, bytes):
                 return base64.b64encode(obj).decode('utf-8')
             elif isinstance(obj, dict):
@@ -3936,16 +5359,18 @@ async def run_workflow(request: dict):
         # Convert bytes to base64 in the actual return value (for FastAPI JSON encoding)
         try:
             serializable_result = convert_bytes_to_base64(final_result)
-            print(f"Final result: {json.dumps(serializable_result, indent=2)}")
+            if workflow_cache_key is not None:
+                _store_cached_workflow_result(workflow_cache_key, serializable_result)
+            if logger.isEnabledFor(logging.DEBUG):
+                logger.debug("Final result: %s", _json_pretty(serializable_result))
             return serializable_result
         except Exception as e:
-            print(f"Warning: Could not serialize final result: {e}")
+            logger.warning("Could not serialize final result: %s", e)
             # Fallback: return original but try to handle bytes at top level
             if isinstance(final_result, dict):
                 cleaned = {}
                 for k, v in final_result.items():
                     if isinstance(v, bytes):
-                        import base64
                         cleaned[k] = base64.b64encode(v).decode('utf-8')
                     else:
                         cleaned[k] = v
@@ -3953,22 +5378,19 @@ async def run_workflow(request: dict):
             return final_result
         
     except Exception as e:
-        print(f"\n=== EXECUTION ERROR ===")
-        print(f"Error: {e}")
-        import traceback
-        traceback.print_exc()
+        logger.exception("Workflow execution error: %s", e)
         
         return {
             'status': 'error',
             'nodes': [],
-            'total_time': 0.0,
+            'total_time': time.perf_counter() - workflow_start_time,
             'error': str(e)
         }
 
 @app.get("/health")
 async def health_check():
     """Health check endpoint"""
-    return {"status": "ok"}
+    return {"status": "ok", "llm_cache": LLM_CACHE.stats(), "llm_semantic_cache": LLM_SEMANTIC_CACHE.stats()}
 
 if __name__ == "__main__":
     import uvicorn
@@ -0,0 +1,107 @@
+// Persistent Node.js worker for TypeScript nodes.
+// Jobs and results are framed as a 4-byte little-endian length followed by a UTF-8 JSON body.
+// Reads jobs on stdin:     {"id": ..., "code": ..., "input": ..., "typescript"?: true}
+// Writes results on stdout: {"id": ..., "success": ..., "result"|"error": ..., "stdout": ..., "stderr": ...}
+const util = require('util');
+
+const HEADER_SIZE = 4;
+
+function makeConsole(stdout, stderr) {
+  const out = (...args) => stdout.push(util.format(...args));
+  const err = (...args) => stderr.push(util.format(...args));
+  return { log: out, info: out, debug: out, warn: err, error: err };
+}
+
+// Transpiler for jobs sent as TypeScript (TS_STRIPPER=node): esbuild when installed,
+// otherwise the typescript package. Loaded on first use since both are slow to require.
+let transpile;
+
+function getTranspiler() {
+  if (transpile === undefined) {
+    transpile = null;
+    try {
+      const esbuild = require('esbuild');
+      transpile = (code) => esbuild.transformSync(code, { loader: 'ts' }).code;
+    } catch (error) {
+      try {
+        const ts = require('typescript');
+        const compilerOptions = { target: ts.ScriptTarget.ES2020 };
+        transpile = (code) => ts.transpileModule(code, { compilerOptions }).outputText;
+      } catch (error) {
+        // Neither package is installed - reported per job below
+      }
+    }
+  }
+  if (!transpile) {
+    throw new Error('Transpiling TypeScript in Node requires the esbuild or typescript package');
+  }
+  return transpile;
+}
+
+// Compiled node bodies keyed by source, so V8 only parses (and TypeScript is only transpiled) once
+const FACTORY_CACHE_SIZE = 256;
+const factories = new Map();
+
+function getFactory(code, typescript) {
+  const key = typescript ? `ts:${code}` : code;
+  let factory = factories.get(key);
+  if (factory) {
+    // Re-insert to keep the Map in least-recently-used order
+    factories.delete(key);
+  } else {
+    const source = typescript ? getTranspiler()(code) : code;
+    factory = new Function('console', 'require', `${source}\nreturn run;`);
+    if (factories.size >= FACTORY_CACHE_SIZE) {
+      factories.delete(factories.keys().next().value);
+    }
+  }
+  factories.set(key, factory);
+  return factory;
+}
+
+async function handle(job, stdout, stderr) {
+  // Shadow console so user output is captured per job instead of corrupting the protocol.
+  // The factory runs per job, so top-level state in the user's code is never shared between jobs.
+  const run = getFactory(job.code, job.typescript)(makeConsole(stdout, stderr), require);
+  return await run(job.input);
+}
+
+function send(message) {
+  const body = Buffer.from(JSON.stringify(message), 'utf8');
+  const header = Buffer.allocUnsafe(HEADER_SIZE);
+  header.writeUInt32LE(body.length, 0);
+  process.stdout.write(Buffer.concat([header, body]));
+}
+
+async function onJob(body) {
+  let job;
+  try {
+    job = JSON.parse(body.toString('utf8'));
+  } catch (error) {
+    return;
+  }
+
+  const stdout = [];
+  const stderr = [];
+  try {
+    const result = await handle(job, stdout, stderr);
+    send({ id: job.id, success: true, result, stdout: stdout.join('\n'), stderr: stderr.join('\n') });
+  } catch (error) {
+    const message = error && error.message ? error.message : String(error);
+    send({ id: job.id, success: false, error: message, stdout: stdout.join('\n'), stderr: stderr.join('\n') });
+  }
+}
+
+// Accumulate stdin chunks and peel off every complete frame
+let buffered = Buffer.alloc(0);
+
+process.stdin.on('data', (chunk) => {
+  buffered = buffered.length ? Buffer.concat([buffered, chunk]) : chunk;
+  while (buffered.length >= HEADER_SIZE) {
+    const length = buffered.readUInt32LE(0);
+    if (buffered.length < HEADER_SIZE + length) break;
+    const body = buffered.subarray(HEADER_SIZE, HEADER_SIZE + length);
+    buffered = buffered.subarray(HEADER_SIZE + length);
+    onJob(body);
+  }
+});
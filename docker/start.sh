@@ -2,7 +2,8 @@
 set -e
 
 echo "Starting FastAPI backend on 0.0.0.0:8000..."
-python3 -m uvicorn api.simple_main:app --host 0.0.0.0 --port 8000 &
+# uvloop and httptools ship with uvicorn[standard]; request them explicitly so a broken install fails loudly
+python3 -m uvicorn api.simple_main:app --host 0.0.0.0 --port 8000 --loop uvloop --http httptools &
 
 # Give the API a moment to start
 sleep 2
@@ -29,6 +29,17 @@ export interface LlmConfig {
    * backwards compatibility with existing configs.
    */
   api_key_name?: string
+  /**
+   * Set to false to always call the provider. Otherwise responses at
+   * temperature 0 are cached by the backend.
+   */
+  cache?: boolean
+  /**
+   * Reuse the response of an earlier, similar prompt (compared by embedding
+   * cosine similarity against semantic_threshold, default 0.95).
+   */
+  semantic_cache?: boolean
+  semantic_threshold?: number
 }
 
 export const DEFAULT_LLM_MODEL = 'gpt-4o-mini'
@@ -99,6 +110,14 @@ export function normalizeLlmConfig(raw: any | undefined | null): LlmConfig {
       ? raw.base_url
       : undefined
 
+  const cache = typeof raw.cache === 'boolean' ? raw.cache : undefined
+
+  const semantic_cache =
+    typeof raw.semantic_cache === 'boolean' ? raw.semantic_cache : undefined
+
+  const semantic_threshold =
+    typeof raw.semantic_threshold === 'number' ? raw.semantic_threshold : undefined
+
   return {
     provider,
     model,
@@ -109,6 +128,9 @@ export function normalizeLlmConfig(raw: any | undefined | null): LlmConfig {
     api_key,
     api_key_name,
     base_url,
+    cache,
+    semantic_cache,
+    semantic_threshold,
   }
 }
 